@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import math
+import random
+from typing import TextIO
+
+# distance between neighbouring grid nodes
+GRID_SPACING = 100.0
+
+# average number of neighbours of a node in a random geometric graph
+GEOMETRIC_DEGREE = 6
+
+# number of existing nodes every new node of a scale-free graph is attached to
+SCALE_FREE_ATTACHMENTS = 2
+
+# weights are the straight-line distance times a random detour factor,
+# so the Euclidean heuristic stays admissible
+MAX_DETOUR = 1.5
+
+# graphs up to this many nodes are written as an adjacency matrix, bigger graphs as an edge list
+MATRIX_MAX_NODES = 2000
+
+GENERATORS = ('grid', 'geometric', 'scale-free')
+
+
+class GraphGenerator:
+    """
+    Reproducible synthetic graphs in the graph file format, every edge is stored in both directions.
+    A generated graph is a list of (x, y) coordinates and a list of (source, target, weight) edges.
+    """
+
+    @staticmethod
+    def __weight(coordinates: list[tuple[float, float]], u: int, v: int, generator: random.Random) -> float:
+        return round(math.dist(coordinates[u], coordinates[v]) * generator.uniform(1.0, MAX_DETOUR) + 0.001, 3)
+
+    @staticmethod
+    def __both_directions(coordinates: list[tuple[float, float]], pairs: list[tuple[int, int]],
+                          generator: random.Random) -> list[tuple[int, int, float]]:
+        edges = []
+        for u, v in pairs:
+            weight = GraphGenerator.__weight(coordinates, u, v, generator)
+            edges.append((u, v, weight))
+            edges.append((v, u, weight))
+        return edges
+
+    @staticmethod
+    def grid(node_count: int, seed: int = 0) -> (list[tuple[float, float]], list[tuple[int, int, float]]):
+        """
+        Road-like grid, every node is connected to its right and lower neighbour
+        :param node_count: number of nodes, the last row may be incomplete
+        :param seed: seed of the random weights
+        :return: the coordinates and the edges
+        """
+        generator = random.Random(seed)
+        width = max(1, math.isqrt(node_count))
+        coordinates = [((i % width) * GRID_SPACING, (i // width) * GRID_SPACING) for i in range(node_count)]
+
+        pairs = []
+        for i in range(node_count):
+            if (i + 1) % width != 0 and i + 1 < node_count:
+                pairs.append((i, i + 1))
+            if i + width < node_count:
+                pairs.append((i, i + width))
+
+        return coordinates, GraphGenerator.__both_directions(coordinates, pairs, generator)
+
+    @staticmethod
+    def geometric(node_count: int, seed: int = 0) -> (list[tuple[float, float]], list[tuple[int, int, float]]):
+        """
+        Random geometric graph, nodes are scattered uniformly and connected to every node within a fixed radius
+        :param node_count: number of nodes
+        :param seed: seed of the random coordinates and weights
+        :return: the coordinates and the edges
+        """
+        generator = random.Random(seed)
+        # one node per GRID_SPACING x GRID_SPACING cell on average
+        side = math.sqrt(node_count) * GRID_SPACING
+        radius = GRID_SPACING * math.sqrt(GEOMETRIC_DEGREE / math.pi)
+        coordinates = [(round(generator.uniform(0, side), 3), round(generator.uniform(0, side), 3))
+                       for _ in range(node_count)]
+
+        # nodes are bucketed into cells of the radius, so only neighbouring cells are compared
+        cells: dict[tuple[int, int], list[int]] = {}
+        for i, (x, y) in enumerate(coordinates):
+            cells.setdefault((int(x // radius), int(y // radius)), []).append(i)
+
+        pairs = []
+        for (cell_x, cell_y), cell_nodes in cells.items():
+            for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+                other_nodes = cells.get((cell_x + dx, cell_y + dy), [])
+                for u in cell_nodes:
+                    for v in other_nodes:
+                        if (dx, dy) == (0, 0) and v <= u:
+                            continue
+                        if math.dist(coordinates[u], coordinates[v]) <= radius:
+                            pairs.append((u, v))
+
+        return coordinates, GraphGenerator.__both_directions(coordinates, pairs, generator)
+
+    @staticmethod
+    def scale_free(node_count: int, seed: int = 0) -> (list[tuple[float, float]], list[tuple[int, int, float]]):
+        """
+        Barabási–Albert graph, every new node is attached to existing nodes with a probability
+        proportional to their degree, which creates a few hubs with many neighbours
+        :param node_count: number of nodes
+        :param seed: seed of the random attachments, coordinates and weights
+        :return: the coordinates and the edges
+        """
+        generator = random.Random(seed)
+        side = math.sqrt(node_count) * GRID_SPACING
+        coordinates = [(round(generator.uniform(0, side), 3), round(generator.uniform(0, side), 3))
+                       for _ in range(node_count)]
+
+        pairs = []
+        # every node appears once per incident edge, a uniform choice from it is a choice by degree
+        endpoints: list[int] = []
+        for v in range(1, node_count):
+            targets = set()
+            while len(targets) < min(SCALE_FREE_ATTACHMENTS, v):
+                targets.add(generator.choice(endpoints) if len(endpoints) > 0 else 0)
+            for u in sorted(targets):
+                pairs.append((u, v))
+                endpoints += (u, v)
+
+        return coordinates, GraphGenerator.__both_directions(coordinates, pairs, generator)
+
+    @staticmethod
+    def generate(name: str, node_count: int, seed: int = 0) -> (list[tuple[float, float]],
+                                                                 list[tuple[int, int, float]]):
+        """
+        :param name: one of GENERATORS
+        :param node_count: number of nodes
+        :param seed: seed of the random choices
+        :return: the coordinates and the edges
+        """
+        if name == 'grid':
+            return GraphGenerator.grid(node_count, seed)
+        if name == 'geometric':
+            return GraphGenerator.geometric(node_count, seed)
+        if name == 'scale-free':
+            return GraphGenerator.scale_free(node_count, seed)
+        raise ValueError(f"Unknown generator '{name}'.")
+
+    @staticmethod
+    def write(file: TextIO, coordinates: list[tuple[float, float]], edges: list[tuple[int, int, float]]) -> None:
+        """
+        Writes a graph in the text graph format, as an adjacency matrix up to MATRIX_MAX_NODES nodes
+        and as an edge list above
+        :param file: where the graph is written
+        :param coordinates: the node coordinates
+        :param edges: the edges
+        """
+        node_count = len(coordinates)
+        file.write(f'{node_count}\n' if node_count <= MATRIX_MAX_NODES else f'{node_count} {len(edges)}\n')
+        for x, y in coordinates:
+            file.write(f'{x} {y}\n')
+
+        if node_count > MATRIX_MAX_NODES:
+            for u, v, weight in edges:
+                file.write(f'{u} {v} {weight}\n')
+            return
+
+        rows: list[dict[int, float]] = [{} for _ in range(node_count)]
+        for u, v, weight in edges:
+            rows[u][v] = weight
+        for row in rows:
+            file.write(' '.join(str(row.get(j, 0)) for j in range(node_count)) + '\n')
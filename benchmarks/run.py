@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Sequence
+
+from benchmarks.generators import GENERATORS, GraphGenerator
+from src.algorithm.main_algorithm import Engine
+from src.io.file_handler import FileInputHandler
+from src.model.graph import Graph
+from src.model.map_graph import MapGraph
+from src.model.node import Node
+
+REPORT_VERSION = 1
+
+DEFAULT_SIZES = (100, 1000, 10000)
+DEFAULT_QUERIES = 20
+DEFAULT_REPEATS = 3
+
+# a timing more than this fraction slower than the baseline is a regression
+DEFAULT_TOLERANCE = 0.2
+
+# generated graphs are placed around this latitude/longitude when map weights are built,
+# with one coordinate unit as one meter
+MAP_ORIGIN = (47.0, 8.0)
+METERS_PER_DEGREE = 111320.0
+
+
+class Benchmark:
+    @staticmethod
+    def __best_time(function, repeats: int) -> float:
+        # the fastest of several runs is the least disturbed by other processes
+        best = float('inf')
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            function()
+            best = min(best, time.perf_counter() - start_time)
+        return best
+
+    @staticmethod
+    def graph_path(directory: str, name: str, node_count: int, seed: int) -> str:
+        """
+        Generates a graph file once, later runs reuse it
+        :param directory: where the generated graph files are kept
+        :param name: one of GENERATORS
+        :param node_count: number of nodes
+        :param seed: seed of the generator
+        :return: path to the graph file
+        """
+        path = os.path.join(directory, f'{name}-{node_count}-{seed}.txt')
+        if not os.path.exists(path):
+            os.makedirs(directory, exist_ok=True)
+            coordinates, edges = GraphGenerator.generate(name, node_count, seed)
+            with open(path + '.part', 'w') as file:
+                GraphGenerator.write(file, coordinates, edges)
+            os.replace(path + '.part', path)
+        return path
+
+    @staticmethod
+    def time_map_weights(node_list: Sequence[Node], graph: Graph) -> float:
+        """
+        Times how the map graph computes path weights and builds its graph, with the nodes placed on the map
+        :param node_list: the nodes, coordinates in meters
+        :param graph: the graph whose edges are the paths
+        :return: the time in seconds
+        """
+        map_graph = MapGraph()
+        for node in node_list:
+            map_graph.add_node(MAP_ORIGIN[0] + node.y / METERS_PER_DEGREE, MAP_ORIGIN[1] + node.x / METERS_PER_DEGREE)
+        pairs = [(u, v) for u, v, _ in graph.edges() if u < v]
+
+        start_time = time.perf_counter()
+        map_graph.cache_edge_weights(pairs)
+        map_graph.build_graph()
+        return time.perf_counter() - start_time
+
+    @staticmethod
+    def run_graph(path: str, queries: int, repeats: int, seed: int) -> dict:
+        """
+        :param path: path to the graph file
+        :param queries: number of random queries answered by every algorithm
+        :param repeats: number of times every measurement is repeated, the fastest run counts
+        :param seed: seed of the random queries
+        :return: the graph size, the timings in seconds (searches per query) and the mean expansions
+        """
+        node_list, graph = FileInputHandler.load_file(path)
+        timings = {'load': Benchmark.__best_time(lambda: FileInputHandler.load_file(path), repeats)}
+        expansions = {}
+
+        generator = random.Random(seed)
+        pairs = [(generator.randrange(len(graph)), generator.randrange(len(graph))) for _ in range(queries)]
+        for name, search in (('ucs', Engine.search_ucs), ('astar', Engine.search_astar)):
+            def search_all() -> None:
+                expansions[name] = 0
+                for start_index, goal_index in pairs:
+                    search(start_index, goal_index, node_list, graph)
+                    expansions[name] += Engine.expansions / max(1, queries)
+
+            timings[name] = Benchmark.__best_time(search_all, repeats) / max(1, queries)
+            expansions[name] = round(expansions[name], 2)
+
+        timings['map_weights'] = min(Benchmark.time_map_weights(node_list, graph) for _ in range(repeats))
+
+        return {'nodes': len(graph), 'edges': graph.edge_count, 'timings': timings, 'expansions': expansions}
+
+    @staticmethod
+    def run(generators: list[str], sizes: list[int], directory: str, queries: int = DEFAULT_QUERIES,
+            repeats: int = DEFAULT_REPEATS, seed: int = 0) -> dict:
+        """
+        :param generators: names of the generators, see GENERATORS
+        :param sizes: node counts of the generated graphs
+        :param directory: where the generated graph files are kept
+        :param queries: number of random queries per graph and algorithm
+        :param repeats: number of times every measurement is repeated
+        :param seed: seed of the generators and the queries
+        :return: the report, results are keyed by "generator/node count"
+        """
+        results = {}
+        for name in generators:
+            for node_count in sizes:
+                path = Benchmark.graph_path(directory, name, node_count, seed)
+                results[f'{name}/{node_count}'] = Benchmark.run_graph(path, queries, repeats, seed)
+                print(f'{name}/{node_count}: {results[f"{name}/{node_count}"]["timings"]}', file=sys.stderr)
+
+        return {
+            'version': REPORT_VERSION,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'queries': queries,
+            'seed': seed,
+            'results': results,
+        }
+
+    @staticmethod
+    def check_comparable(report: dict, baseline: dict) -> None:
+        """
+        :param report: the current report
+        :param baseline: an earlier report
+        :raises RuntimeError: if the reports were run with a different report version, query count or seed,
+        or if a graph of the report is missing from the baseline or has a different size there
+        """
+        for setting in ('version', 'queries', 'seed'):
+            if report.get(setting) != baseline.get(setting):
+                raise RuntimeError(f"The baseline was run with {setting} {baseline.get(setting)}, "
+                                   f"the report with {report.get(setting)}.")
+
+        for key, result in report['results'].items():
+            baseline_result = baseline.get('results', {}).get(key)
+            if baseline_result is None:
+                raise RuntimeError(f"The baseline has no results for {key}.")
+            if (result['nodes'], result['edges']) != (baseline_result['nodes'], baseline_result['edges']):
+                raise RuntimeError(f"The baseline graph {key} has {baseline_result['nodes']} nodes and "
+                                   f"{baseline_result['edges']} edges, the report graph has {result['nodes']} nodes "
+                                   f"and {result['edges']} edges.")
+
+    @staticmethod
+    def compare(report: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[dict]:
+        """
+        :param report: the current report
+        :param baseline: an earlier report of the same graphs, queries and seed
+        :param tolerance: fraction by which a timing may exceed its baseline
+        :return: one entry per timing found in both reports, with its ratio to the baseline and
+        whether it is a regression
+        :raises RuntimeError: if the reports did not measure the same thing, see check_comparable
+        """
+        Benchmark.check_comparable(report, baseline)
+
+        comparisons = []
+        for key, result in report['results'].items():
+            baseline_result = baseline['results'][key]
+            for name, seconds in result['timings'].items():
+                baseline_seconds = baseline_result['timings'].get(name)
+                if baseline_seconds is None or baseline_seconds <= 0:
+                    continue
+
+                ratio = seconds / baseline_seconds
+                comparisons.append({'graph': key, 'timing': name, 'seconds': seconds,
+                                    'baseline': baseline_seconds, 'ratio': ratio,
+                                    'regression': ratio > 1 + tolerance})
+
+        return comparisons
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='benchmarks.run',
+                                     description='Time loading, searching and map weight building on generated '
+                                                 'graphs and write a JSON report.')
+    parser.add_argument('-g', '--generators', nargs='+', choices=GENERATORS, default=list(GENERATORS),
+                        help='graph generators to run')
+    parser.add_argument('-s', '--sizes', nargs='+', type=int, default=list(DEFAULT_SIZES),
+                        help='node counts of the generated graphs')
+    parser.add_argument('-q', '--queries', type=int, default=DEFAULT_QUERIES,
+                        help='random queries per graph and algorithm')
+    parser.add_argument('-r', '--repeats', type=int, default=DEFAULT_REPEATS,
+                        help='times every measurement is repeated, the fastest run counts')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the generators and the queries')
+    parser.add_argument('-d', '--directory', default=os.path.join('benchmarks', 'graphs'),
+                        help='where the generated graph files are kept')
+    parser.add_argument('-o', '--output', default=None, help='report file, written to standard output by default')
+    parser.add_argument('-b', '--baseline', default=None,
+                        help='earlier report of the same graphs, queries and seed to compare against, '
+                             'the exit status is 1 if any timing regressed and 2 if the reports differ')
+    parser.add_argument('-t', '--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='fraction by which a timing may exceed the baseline')
+    args = parser.parse_args(argv)
+
+    report = Benchmark.run(args.generators, args.sizes, args.directory, args.queries, args.repeats, args.seed)
+
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline is None:
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+
+    try:
+        comparisons = Benchmark.compare(report, baseline, args.tolerance)
+    except RuntimeError as error:
+        print(f"Cannot compare with {args.baseline}: {error}", file=sys.stderr)
+        return 2
+
+    regressed = False
+    for comparison in comparisons:
+        marker = 'REGRESSION' if comparison['regression'] else ''
+        print(f"{comparison['graph']:>20} {comparison['timing']:>22} {comparison['seconds']:12.6f} s "
+              f"{comparison['ratio']:7.2f}x {marker}", file=sys.stderr)
+        regressed = regressed or comparison['regression']
+
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from src.algorithm.main_algorithm import Engine
+from src.io.binary_file_handler import BinaryFileHandler
+from src.model.graph import Graph
+
+try:
+    import numpy
+except ImportError:  # all-pairs distances are not available
+    numpy = None
+
+DISTANCES_FILE_NAME = 'distances.npy'
+PREDECESSORS_FILE_NAME = 'predecessors.npy'
+
+# graphs up to this many nodes are solved with Floyd-Warshall if they are dense, other graphs with repeated Dijkstra
+FLOYD_WARSHALL_MAX_NODES = 2000
+# smallest fraction of the node pairs joined by an edge for which Floyd-Warshall beats Dijkstra on one core
+FLOYD_WARSHALL_MIN_DENSITY = 0.01
+# number of rows updated by Floyd-Warshall at once, bounds the size of the temporary arrays
+FLOYD_WARSHALL_BLOCK_SIZE = 256
+
+# Graph and output matrices of the worker process, opened once by the pool initializer
+_worker_graph: Graph = Graph()
+_worker_distances: numpy.ndarray = None
+_worker_predecessors: numpy.ndarray = None
+
+
+def _open_worker_files(binary_path: str, output_directory: str) -> None:
+    global _worker_graph, _worker_distances, _worker_predecessors
+    _, _worker_graph = BinaryFileHandler.load_file(binary_path)
+    _worker_distances = numpy.load(os.path.join(output_directory, DISTANCES_FILE_NAME), mmap_mode='r+')
+    _worker_predecessors = numpy.load(os.path.join(output_directory, PREDECESSORS_FILE_NAME), mmap_mode='r+')
+
+
+def _fill_rows_in_worker(source_indices: range) -> None:
+    AllPairs.fill_rows(_worker_graph, _worker_distances, _worker_predecessors, source_indices)
+    _worker_distances.flush()
+    _worker_predecessors.flush()
+
+
+class AllPairs:
+    """
+    Shortest route costs between every pair of nodes.
+    Row i of the distance matrix holds the costs from node i, infinity if a node is unreachable.
+    Row i of the predecessor matrix holds the previous node of every route from node i, -1 if there is none.
+    Both matrices are .npy files which are written and returned memory-mapped.
+    """
+
+    @staticmethod
+    def __create_files(output_directory: str, node_count: int) -> (numpy.ndarray, numpy.ndarray):
+        os.makedirs(output_directory, exist_ok=True)
+        distances = numpy.lib.format.open_memmap(os.path.join(output_directory, DISTANCES_FILE_NAME), mode='w+',
+                                                 dtype=numpy.float64, shape=(node_count, node_count))
+        predecessors = numpy.lib.format.open_memmap(os.path.join(output_directory, PREDECESSORS_FILE_NAME),
+                                                    mode='w+', dtype=numpy.int32, shape=(node_count, node_count))
+        return distances, predecessors
+
+    @staticmethod
+    def __open_files(output_directory: str) -> (numpy.ndarray, numpy.ndarray):
+        return (numpy.load(os.path.join(output_directory, DISTANCES_FILE_NAME), mmap_mode='r'),
+                numpy.load(os.path.join(output_directory, PREDECESSORS_FILE_NAME), mmap_mode='r'))
+
+    @staticmethod
+    def fill_rows(graph: Graph, distances: numpy.ndarray, predecessors: numpy.ndarray, source_indices: range) -> None:
+        """
+        Fills the rows of the given source nodes with their shortest path trees
+        :param graph: the graph
+        :param distances: the distance matrix
+        :param predecessors: the predecessor matrix
+        :param source_indices: indices of the source nodes
+        """
+        for source_index in source_indices:
+            tree = Engine.shortest_path_tree(source_index, graph, cache=False)
+            distances[source_index] = numpy.frombuffer(tree.distances, dtype=numpy.float64)
+            predecessors[source_index] = numpy.frombuffer(tree.predecessors, dtype=numpy.int64)
+
+    @staticmethod
+    def floyd_warshall(graph: Graph, output_directory: str) -> (numpy.ndarray, numpy.ndarray):
+        """
+        Vectorized Floyd-Warshall, meant for small or dense graphs
+        :param graph: the graph
+        :param output_directory: where the matrices are written
+        :return: the memory-mapped distance matrix and predecessor matrix
+        """
+        node_count = len(graph)
+
+        # the matrices of small graphs fit in memory, they are only written to the files at the end
+        distances = numpy.empty((node_count, node_count), dtype=numpy.float64)
+        predecessors = numpy.empty((node_count, node_count), dtype=numpy.int32)
+
+        sources = numpy.repeat(numpy.arange(node_count), numpy.diff(numpy.asarray(graph.offsets, dtype=numpy.int64)))
+        targets = numpy.asarray(graph.neighbours, dtype=numpy.int64)
+
+        distances[:] = numpy.inf
+        numpy.minimum.at(distances, (sources, targets), numpy.asarray(graph.weights, dtype=numpy.float64))
+        numpy.fill_diagonal(distances, 0.0)
+        predecessors[:] = numpy.where(numpy.isinf(distances), -1, numpy.arange(node_count)[:, None])
+        numpy.fill_diagonal(predecessors, -1)
+
+        for k in range(node_count):
+            # row k and column k do not change while routes through node k are considered
+            distances_from_k = numpy.array(distances[k])
+            predecessors_from_k = numpy.array(predecessors[k])
+
+            for block_start in range(0, node_count, FLOYD_WARSHALL_BLOCK_SIZE):
+                block = slice(block_start, block_start + FLOYD_WARSHALL_BLOCK_SIZE)
+                distances_through_k = distances[block, k, None] + distances_from_k
+                is_shorter = distances_through_k < distances[block]
+
+                numpy.copyto(distances[block], distances_through_k, where=is_shorter)
+                numpy.copyto(predecessors[block], numpy.broadcast_to(predecessors_from_k, is_shorter.shape),
+                             where=is_shorter)
+
+        distances_file, predecessors_file = AllPairs.__create_files(output_directory, node_count)
+        distances_file[:] = distances
+        predecessors_file[:] = predecessors
+        distances_file.flush()
+        predecessors_file.flush()
+
+        # the files are unmapped before they are opened again read-only
+        del distances_file, predecessors_file
+        return AllPairs.__open_files(output_directory)
+
+    @staticmethod
+    def repeated_dijkstra(binary_path: str, node_count: int, output_directory: str, workers: int = None,
+                          chunk_size: int = 64) -> (numpy.ndarray, numpy.ndarray):
+        """
+        Runs Dijkstra's algorithm from every node in a pool of processes, meant for big sparse graphs.
+        Every worker memory-maps the graph and the output matrices once and writes its rows directly.
+        :param binary_path: path to the graph in the binary graph format
+        :param node_count: number of nodes in the graph
+        :param output_directory: where the matrices are written
+        :param workers: number of worker processes, defaults to the number of CPUs
+        :param chunk_size: number of source nodes sent to a worker at once
+        :return: the memory-mapped distance matrix and predecessor matrix
+        """
+        distances, predecessors = AllPairs.__create_files(output_directory, node_count)
+        del distances, predecessors
+
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_open_worker_files,
+                                 initargs=(binary_path, output_directory)) as executor:
+            chunks = [range(start, min(start + chunk_size, node_count))
+                      for start in range(0, node_count, chunk_size)]
+            for _ in executor.map(_fill_rows_in_worker, chunks):
+                pass
+
+        return AllPairs.__open_files(output_directory)
+
+    @staticmethod
+    def uses_floyd_warshall(graph: Graph) -> bool:
+        """
+        :param graph: the graph
+        :return: True if the graph is small and dense enough for Floyd-Warshall, False for repeated Dijkstra
+        """
+        node_count = len(graph)
+        return node_count <= FLOYD_WARSHALL_MAX_NODES and \
+            graph.edge_count >= FLOYD_WARSHALL_MIN_DENSITY * node_count * node_count
+
+    @staticmethod
+    def compute(graph_path: str, output_directory: str, workers: int = None) -> (numpy.ndarray, numpy.ndarray):
+        """
+        Computes the all-pairs distance matrix and predecessor matrix with the method suiting the graph size
+        and density
+        :param graph_path: path to the graph file
+        :param output_directory: where the matrices are written
+        :param workers: number of worker processes used for big graphs, defaults to the number of CPUs
+        :return: the memory-mapped distance matrix and predecessor matrix
+        """
+        if numpy is None:
+            raise RuntimeError("NumPy is required to compute all-pairs distances.")
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            # a text graph file is only parsed once, the workers memory-map the converted copy
+            binary_path = BinaryFileHandler.binary_path_of(graph_path, temporary_directory)
+
+            # the graph is unmapped before the directory holding it is removed, which Windows requires
+            _, graph = BinaryFileHandler.load_file(binary_path)
+            with graph:
+                node_count = len(graph)
+                if AllPairs.uses_floyd_warshall(graph):
+                    return AllPairs.floyd_warshall(graph, output_directory)
+
+            return AllPairs.repeated_dijkstra(binary_path, node_count, output_directory, workers)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import itertools
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Sequence
+
+from src.algorithm.contraction_hierarchy import ContractionHierarchy
+from src.algorithm.landmarks import LandmarkHeuristic, LandmarkTable
+from src.algorithm.main_algorithm import Engine
+from src.io.binary_file_handler import BinaryFileHandler
+from src.model.graph import Graph
+from src.model.node import Node
+
+# Algorithm names accepted in queries
+ALGORITHMS = {
+    'astar': Engine.search_astar,
+    'a*': Engine.search_astar,
+    'ucs': Engine.search_repeated_ucs,
+    'bidirectional': Engine.search_bidirectional,
+}
+# Queries answered by the contraction hierarchy
+HIERARCHY_ALGORITHM = 'ch'
+# Queries answered by A* with the landmark heuristic
+LANDMARK_ALGORITHM = 'alt'
+
+# number of queries read at once by search_all, two windows are held in memory at most
+QUERY_WINDOW_SIZE = 4096
+
+# Graph, hierarchy and landmarks of the worker process, loaded once by the pool initializer
+_worker_node_list: Sequence[Node] = []
+_worker_graph: Graph = Graph()
+_worker_hierarchy: ContractionHierarchy | None = None
+_worker_landmarks: LandmarkTable | None = None
+
+
+def _load_worker_graph(binary_path: str, hierarchy_path: str | None, landmarks_path: str | None) -> None:
+    global _worker_node_list, _worker_graph, _worker_hierarchy, _worker_landmarks
+    _worker_node_list, _worker_graph = BinaryFileHandler.load_file(binary_path)
+    if hierarchy_path is not None:
+        _worker_hierarchy = ContractionHierarchy.load(hierarchy_path, _worker_graph)
+    if landmarks_path is not None:
+        _worker_landmarks = LandmarkTable.load(landmarks_path, _worker_graph)
+
+
+def _search_in_worker(query: tuple[int, int, str]) -> dict:
+    return BatchSearch.search(query[0], query[1], query[2], _worker_node_list, _worker_graph,
+                              _worker_hierarchy, _worker_landmarks)
+
+
+class BatchSearch:
+    @staticmethod
+    def search(start_index: int, goal_index: int, algorithm: str,
+               node_list: Sequence[Node], graph: Graph, hierarchy: ContractionHierarchy = None,
+               landmarks: LandmarkTable = None) -> dict:
+        """
+        :param start_index: index of the starting node
+        :param goal_index: index of the destination node
+        :param algorithm: name of the algorithm, one of ALGORITHMS, HIERARCHY_ALGORITHM or LANDMARK_ALGORITHM
+        :param node_list: the list of nodes
+        :param graph: the graph
+        :param hierarchy: the contraction hierarchy of the graph, needed by HIERARCHY_ALGORITHM queries
+        :param landmarks: the landmark table of the graph, needed by LANDMARK_ALGORITHM queries
+        :return: the query and its cost, route, number of expansions, search time (in seconds) and search statistics,
+        or the query and an error message if the query is invalid
+        """
+        if algorithm.lower() == HIERARCHY_ALGORITHM and hierarchy is None:
+            return {'start': start_index, 'goal': goal_index, 'algorithm': algorithm,
+                    'error': "No contraction hierarchy loaded."}
+        if algorithm.lower() == LANDMARK_ALGORITHM and landmarks is None:
+            return {'start': start_index, 'goal': goal_index, 'algorithm': algorithm,
+                    'error': "No landmarks loaded."}
+        if algorithm.lower() not in ALGORITHMS and algorithm.lower() not in (HIERARCHY_ALGORITHM,
+                                                                             LANDMARK_ALGORITHM):
+            return {'start': start_index, 'goal': goal_index, 'algorithm': algorithm,
+                    'error': f"Unknown algorithm '{algorithm}'."}
+        if not (0 <= start_index < len(graph) and 0 <= goal_index < len(graph)):
+            return {'start': start_index, 'goal': goal_index, 'algorithm': algorithm,
+                    'error': "Node index out of range."}
+
+        if algorithm.lower() == HIERARCHY_ALGORITHM:
+            start_time = time.perf_counter()
+            result = hierarchy.query(start_index, goal_index, node_list)
+            elapsed_time = time.perf_counter() - start_time
+            expansions = hierarchy.expansions
+            stats = hierarchy.stats
+        elif algorithm.lower() == LANDMARK_ALGORITHM:
+            start_time = time.perf_counter()
+            result = Engine.search_astar(start_index, goal_index, node_list, graph, LandmarkHeuristic(landmarks))
+            elapsed_time = time.perf_counter() - start_time
+            expansions = Engine.expansions
+            stats = Engine.stats
+        else:
+            search = ALGORITHMS[algorithm.lower()]
+            start_time = time.perf_counter()
+            result = search(start_index, goal_index, node_list, graph)
+            elapsed_time = time.perf_counter() - start_time
+            expansions = Engine.expansions
+            stats = Engine.stats
+
+        cost, path = result if result is not None else (None, None)
+        return {
+            'start': start_index,
+            'goal': goal_index,
+            'algorithm': algorithm,
+            'cost': cost,
+            'path': [node.node_id for node in path] if path is not None else None,
+            'expansions': expansions,
+            'time': elapsed_time,
+            'stats': stats.to_dict(),
+        }
+
+    @staticmethod
+    def search_all(queries: Iterable[tuple[int, int, str]], graph_path: str, workers: int = None,
+                   chunk_size: int = 16, hierarchy_path: str = None, landmarks_path: str = None,
+                   node_list: Sequence[Node] = None, graph: Graph = None,
+                   window_size: int = QUERY_WINDOW_SIZE) -> Iterator[dict]:
+        """
+        Answers independent queries in a pool of processes.
+        Every worker memory-maps the graph once, text graph files are converted to a temporary binary file first.
+        The queries are read a window at a time, so a query stream of any length is answered in bounded memory.
+        :param queries: (start index, goal index, algorithm) queries
+        :param graph_path: path to the graph file
+        :param workers: number of worker processes, defaults to the number of CPUs
+        :param chunk_size: number of queries sent to a worker at once
+        :param hierarchy_path: path to the contraction hierarchy file of the graph, loaded once by every worker
+        :param landmarks_path: path to the landmark file of the graph, loaded once by every worker
+        :param node_list: the nodes of the graph file if they are already loaded, a text file is then not parsed again
+        :param graph: the graph of the graph file if it is already loaded
+        :param window_size: number of queries read at once, the next window is answered while a window is returned
+        :return: an iterator of the results of BatchSearch.search, in the order of the queries
+        """
+        queries = iter(queries)
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            binary_path = BinaryFileHandler.binary_path_of(graph_path, temporary_directory, node_list, graph)
+
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=_load_worker_graph,
+                                     initargs=(binary_path, hierarchy_path, landmarks_path)) as executor:
+                answered_window = None
+                while True:
+                    window = list(itertools.islice(queries, window_size))
+                    if len(window) == 0:
+                        break
+
+                    answers = executor.map(_search_in_worker, window, chunksize=chunk_size)
+                    if answered_window is not None:
+                        yield from answered_window
+                    answered_window = answers
+
+                if answered_window is not None:
+                    yield from answered_window
@@ -0,0 +1,376 @@
+from __future__ import annotations
+
+import heapq
+import math
+import struct
+from array import array
+from typing import Sequence
+
+from src.algorithm.search_stats import SEARCH, TRACE, SearchStats
+from src.io.section_file import SectionFile
+from src.model.graph import Graph
+from src.model.node import Node
+
+# file layout (little-endian):
+#   header                       magic, format version, node count, upward edge counts (forward, backward)
+#   fingerprint                  node count, edge count and digest of the graph the hierarchy was built for
+#   ranks                        int32[node count]
+#   forward and backward graph   offsets int64[node count + 1], weights float64[edge count],
+#                                targets int32[edge count], middles int32[edge count]
+MAGIC = b'CMCH'
+VERSION = 2
+HEADER = struct.Struct('<4sIqqq')
+
+HIERARCHY_FILE_EXTENSION = '.cch'
+
+# witness searches give up after settling this many nodes, which only costs an unnecessary shortcut
+WITNESS_SETTLE_LIMIT = 64
+
+
+class UpwardGraph:
+    """
+    Edges of a contraction hierarchy leading to higher ranked nodes, in compressed sparse row form.
+    The middle of a shortcut is the contracted node it bypasses, the middle of an original edge is -1.
+    """
+
+    def __init__(self, offsets: array, targets: array, weights: array, middles: array):
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.middles = middles
+
+    def edges_of(self, index: int) -> zip:
+        """
+        :param index: the node index
+        :return: an iterator of (target index, weight, middle index) of the upward edges of the node
+        """
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return zip(self.targets[start:end], self.weights[start:end], self.middles[start:end])
+
+    def edge(self, index: int, target_index: int) -> (float, int):
+        """
+        :param index: the node index
+        :param target_index: index of the higher ranked node
+        :return: the weight and middle index of the upward edge between the two nodes
+        """
+        for target, weight, middle in self.edges_of(index):
+            if target == target_index:
+                return weight, middle
+        raise KeyError((index, target_index))
+
+    @staticmethod
+    def from_lists(edge_lists: list[list[tuple[int, float, int]]]) -> UpwardGraph:
+        offsets = array('q', [0])
+        targets = array('i')
+        weights = array('d')
+        middles = array('i')
+        for edge_list in edge_lists:
+            for target, weight, middle in edge_list:
+                targets.append(target)
+                weights.append(weight)
+                middles.append(middle)
+            offsets.append(len(targets))
+
+        return UpwardGraph(offsets, targets, weights, middles)
+
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy of a graph.
+    Nodes are contracted one by one, from the least to the most important, and shortcuts are added between
+    the neighbours of a contracted node whenever it lies on their only shortest route.
+    A query is a bidirectional search which only ever moves to higher ranked nodes.
+    """
+
+    def __init__(self, ranks: array, forward: UpwardGraph, backward: UpwardGraph):
+        self.ranks = ranks
+        # forward holds the edges u -> v with rank[u] < rank[v], stored at u
+        self.forward = forward
+        # backward holds the edges v -> u with rank[u] < rank[v], stored at u
+        self.backward = backward
+        # number of nodes expanded by the last query
+        self.expansions = 0
+        # counters and phase times of the last query
+        self.stats = SearchStats()
+
+    def __len__(self) -> int:
+        return len(self.ranks)
+
+    @staticmethod
+    def __witness_distances(out_edges: list[dict[int, float]], source_index: int, excluded_index: int,
+                            targets: dict[int, float], max_cost: float) -> dict[int, float]:
+        # limited Dijkstra from the source which never passes through the excluded node,
+        # it stops once every target is settled
+        distances = {source_index: 0.0}
+        queue = [(0.0, source_index)]
+        settled_count = 0
+        remaining_targets = len(targets) - (source_index in targets)
+        while len(queue) > 0 and settled_count < WITNESS_SETTLE_LIMIT and remaining_targets > 0:
+            distance, node_index = heapq.heappop(queue)
+            if distance > distances[node_index]:
+                continue
+            if distance > max_cost:
+                break
+
+            settled_count += 1
+            if node_index in targets and node_index != source_index:
+                remaining_targets -= 1
+            for i, weight in out_edges[node_index].items():
+                if i == excluded_index:
+                    continue
+                new_distance = distance + weight
+                if new_distance < distances.get(i, math.inf):
+                    distances[i] = new_distance
+                    heapq.heappush(queue, (new_distance, i))
+
+        return distances
+
+    @staticmethod
+    def __shortcuts(out_edges: list[dict[int, float]], in_edges: list[dict[int, float]],
+                    node_index: int) -> list[tuple[int, int, float]]:
+        # shortcuts needed to contract the node
+        outgoing = out_edges[node_index]
+        if len(outgoing) == 0:
+            return []
+
+        max_outgoing_weight = max(outgoing.values())
+        shortcuts = []
+        for u, incoming_weight in in_edges[node_index].items():
+            distances = ContractionHierarchy.__witness_distances(out_edges, u, node_index, outgoing,
+                                                                 incoming_weight + max_outgoing_weight)
+            for x, outgoing_weight in outgoing.items():
+                if x == u:
+                    continue
+                cost = incoming_weight + outgoing_weight
+                if distances.get(x, math.inf) > cost:
+                    shortcuts.append((u, x, cost))
+
+        return shortcuts
+
+    @staticmethod
+    def build(graph: Graph) -> ContractionHierarchy:
+        """
+        :param graph: the graph
+        :return: the contraction hierarchy of the graph
+        """
+        node_count = len(graph)
+
+        # remaining graph, parallel edges keep their lightest weight and self loops are never useful
+        out_edges: list[dict[int, float]] = [{} for _ in range(node_count)]
+        in_edges: list[dict[int, float]] = [{} for _ in range(node_count)]
+        for u, v, weight in graph.edges():
+            if u != v and weight < out_edges[u].get(v, math.inf):
+                out_edges[u][v] = weight
+                in_edges[v][u] = weight
+
+        # contracted node bypassed by every shortcut of the remaining graph
+        middles: dict[tuple[int, int], int] = {}
+        contracted_neighbours = array('i', [0]) * node_count
+
+        def priority(index: int, shortcuts: list[tuple[int, int, float]]) -> int:
+            # edge difference, plus the contracted neighbours to spread the contraction evenly over the graph
+            edge_count = len(out_edges[index]) + len(in_edges[index])
+            return len(shortcuts) - edge_count + contracted_neighbours[index]
+
+        queue = [(priority(i, ContractionHierarchy.__shortcuts(out_edges, in_edges, i)), i) for i in range(node_count)]
+        heapq.heapify(queue)
+
+        ranks = array('i', [0]) * node_count
+        forward_lists: list[list[tuple[int, float, int]]] = [[] for _ in range(node_count)]
+        backward_lists: list[list[tuple[int, float, int]]] = [[] for _ in range(node_count)]
+
+        rank = 0
+        while len(queue) > 0:
+            _, node_index = heapq.heappop(queue)
+
+            # lazy update, the priority may have grown since the node was pushed
+            shortcuts = ContractionHierarchy.__shortcuts(out_edges, in_edges, node_index)
+            new_priority = priority(node_index, shortcuts)
+            if len(queue) > 0 and new_priority > queue[0][0]:
+                heapq.heappush(queue, (new_priority, node_index))
+                continue
+
+            ranks[node_index] = rank
+            rank += 1
+
+            # every remaining neighbour is contracted later, so all remaining edges lead upward
+            for x, weight in out_edges[node_index].items():
+                forward_lists[node_index].append((x, weight, middles.pop((node_index, x), -1)))
+                del in_edges[x][node_index]
+                contracted_neighbours[x] += 1
+            for u, weight in in_edges[node_index].items():
+                backward_lists[node_index].append((u, weight, middles.pop((u, node_index), -1)))
+                del out_edges[u][node_index]
+                contracted_neighbours[u] += 1
+            out_edges[node_index] = {}
+            in_edges[node_index] = {}
+
+            for u, x, cost in shortcuts:
+                if cost < out_edges[u].get(x, math.inf):
+                    out_edges[u][x] = cost
+                    in_edges[x][u] = cost
+                    middles[(u, x)] = node_index
+
+        return ContractionHierarchy(ranks,
+                                    UpwardGraph.from_lists(forward_lists),
+                                    UpwardGraph.from_lists(backward_lists))
+
+    def __edge(self, first_index: int, second_index: int) -> (float, int):
+        # weight and middle of the hierarchy edge first -> second
+        if self.ranks[first_index] < self.ranks[second_index]:
+            return self.forward.edge(first_index, second_index)
+        return self.backward.edge(second_index, first_index)
+
+    def __unpack(self, path_indices: list[int]) -> (float, list[int]):
+        # replaces every shortcut with the two edges it bypasses until only original edges remain
+        cost = 0.0
+        unpacked_indices = [path_indices[0]]
+        stack = [(first, second) for first, second in zip(reversed(path_indices[:-1]), reversed(path_indices[1:]))]
+        while len(stack) > 0:
+            first_index, second_index = stack.pop()
+            weight, middle_index = self.__edge(first_index, second_index)
+            if middle_index == -1:
+                cost += weight
+                unpacked_indices.append(second_index)
+            else:
+                stack.append((middle_index, second_index))
+                stack.append((first_index, middle_index))
+
+        return cost, unpacked_indices
+
+    def __trace(self, parents: tuple[dict, dict], meeting_index: int,
+                node_list: Sequence[Node]) -> (float, list[Node]):
+        # forward half up to the meeting node, then the backward half down to the destination node
+        path_indices: list[int] = []
+        current_index = meeting_index
+        while current_index != -1:
+            path_indices.append(current_index)
+            current_index = parents[0][current_index]
+        path_indices.reverse()
+
+        current_index = parents[1][meeting_index]
+        while current_index != -1:
+            path_indices.append(current_index)
+            current_index = parents[1][current_index]
+
+        cost, unpacked_indices = self.__unpack(path_indices)
+        return cost, [node_list[i] for i in unpacked_indices]
+
+    def query(self, start_index: int, goal_index: int, node_list: Sequence[Node]) -> (float, list[Node]):
+        """
+        :param start_index: index of the starting node
+        :param goal_index: index of the destination node
+        :param node_list: the list of nodes
+        :return: the cost and the list of nodes of the route, or None if there is no route
+        """
+        self.expansions = 0
+        self.stats = stats = SearchStats()
+        if start_index == goal_index:
+            return 0.0, [node_list[start_index]]
+
+        # index 0 holds the forward search, index 1 the backward search
+        graphs = (self.forward, self.backward)
+        distances = ({start_index: 0.0}, {goal_index: 0.0})
+        parents = ({start_index: -1}, {goal_index: -1})
+        queues = ([(0.0, start_index)], [(0.0, goal_index)])
+
+        best_cost = math.inf
+        meeting_index = -1
+
+        expansions = relaxed = pops = stale_pops = 0
+        pushes = peak_queue_size = 2
+        with stats.phase(SEARCH):
+            while True:
+                # a search stops once its queue cannot improve the best route anymore
+                forward_done = len(queues[0]) == 0 or queues[0][0][0] >= best_cost
+                backward_done = len(queues[1]) == 0 or queues[1][0][0] >= best_cost
+                if forward_done and backward_done:
+                    break
+
+                side = 1 if forward_done or (not backward_done and queues[1][0][0] < queues[0][0][0]) else 0
+                distance, node_index = heapq.heappop(queues[side])
+                pops += 1
+                if distance > distances[side][node_index]:
+                    stale_pops += 1
+                    continue
+
+                expansions += 1
+                other_distance = distances[1 - side].get(node_index)
+                if other_distance is not None and distance + other_distance < best_cost:
+                    best_cost = distance + other_distance
+                    meeting_index = node_index
+
+                # stall on demand, a higher ranked node already offers a shorter route to this node
+                side_distances = distances[side]
+                if any(side_distances.get(i, math.inf) + weight < distance
+                       for i, weight, _ in graphs[1 - side].edges_of(node_index)):
+                    continue
+
+                relaxed += graphs[side].offsets[node_index + 1] - graphs[side].offsets[node_index]
+                for i, weight, _ in graphs[side].edges_of(node_index):
+                    new_distance = distance + weight
+                    if new_distance < distances[side].get(i, math.inf):
+                        distances[side][i] = new_distance
+                        parents[side][i] = node_index
+                        heapq.heappush(queues[side], (new_distance, i))
+                        pushes += 1
+                        if len(queues[0]) + len(queues[1]) > peak_queue_size:
+                            peak_queue_size = len(queues[0]) + len(queues[1])
+
+        self.expansions = expansions
+        stats.expanded = expansions
+        stats.relaxed = relaxed
+        stats.pushes = pushes
+        stats.pops = pops
+        stats.stale_pops = stale_pops
+        stats.peak_queue_size = peak_queue_size
+        if meeting_index == -1:
+            return None
+
+        with stats.phase(TRACE):
+            return self.__trace(parents, meeting_index, node_list)
+
+    def save(self, path: str, graph: Graph) -> None:
+        """
+        :param path: path to the hierarchy file
+        :param graph: the graph the hierarchy was built for, its fingerprint is stored with the hierarchy
+        """
+        sections = [array('i', self.ranks)]
+        for upward_graph in (self.forward, self.backward):
+            sections += [array('q', upward_graph.offsets), array('d', upward_graph.weights),
+                         array('i', upward_graph.targets), array('i', upward_graph.middles)]
+
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(self.ranks),
+                                   len(self.forward.targets), len(self.backward.targets)))
+            file.write(SectionFile.graph_fingerprint(graph))
+            SectionFile.write_sections(file, sections)
+
+    @staticmethod
+    def load(path: str, graph: Graph = None) -> ContractionHierarchy:
+        """
+        :param path: path to the hierarchy file
+        :param graph: the graph the hierarchy is used with, checked against the stored fingerprint if given
+        :return: the contraction hierarchy
+        :raises RuntimeError: if the file is invalid or was built for a different graph
+        """
+        with open(path, 'rb') as file:
+            header = file.read(HEADER.size)
+            if len(header) != HEADER.size:
+                raise RuntimeError("Error while processing file.")
+
+            magic, version, node_count, forward_count, backward_count = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION or min(node_count, forward_count, backward_count) < 0:
+                raise RuntimeError("Error while processing file.")
+            SectionFile.read_fingerprint(file, graph)
+
+            ranks = SectionFile.read_section(file, 'i', node_count)
+            upward_graphs = []
+            for edge_count in (forward_count, backward_count):
+                offsets = SectionFile.read_section(file, 'q', node_count + 1)
+                weights = SectionFile.read_section(file, 'd', edge_count)
+                targets = SectionFile.read_section(file, 'i', edge_count)
+                middles = SectionFile.read_section(file, 'i', edge_count)
+                upward_graphs.append(UpwardGraph(offsets, targets, weights, middles))
+
+        return ContractionHierarchy(ranks, upward_graphs[0], upward_graphs[1])
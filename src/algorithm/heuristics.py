@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import math
+from array import array
+from typing import Callable, Sequence
+
+from src.common import distance_operations
+from src.model.node import Node
+from src.model.node_table import NodeTable
+
+try:
+    import numpy
+except ImportError:  # estimates are computed node by node and memoized instead
+    numpy = None
+
+
+class Heuristic:
+    """
+    Estimates the cost of the cheapest route from a node to the goal.
+    A heuristic is consistent if estimate(u) <= weight(u, v) + estimate(v) holds for every edge (u, v).
+    """
+    consistent: bool = False
+
+    def estimate(self, node: Node, goal_node: Node) -> float:
+        raise NotImplementedError
+
+    def estimator(self, node_list: Sequence[Node], goal_index: int) -> Callable[[int], float]:
+        """
+        :param node_list: the list of nodes
+        :param goal_index: index of the destination node
+        :return: a function estimating the remaining cost from a node index, used by searches working on indices
+        """
+        goal_node = node_list[goal_index]
+        estimate = self.estimate
+        return lambda index: estimate(node_list[index], goal_node)
+
+    def estimator_from(self, node_list: Sequence[Node], start_index: int) -> Callable[[int], float]:
+        """
+        Heuristics which ignore the direction of the edges estimate the cost from the start like the route back
+        :param node_list: the list of nodes
+        :param start_index: index of the starting node
+        :return: a function estimating the cost from the starting node to a node index, used by backward searches
+        """
+        return self.estimator(node_list, start_index)
+
+    def estimates(self, node_list: Sequence[Node], goal_index: int) -> array | None:
+        """
+        :param node_list: the list of nodes
+        :param goal_index: index of the destination node
+        :return: the estimate of every node at once, or None if the heuristic cannot be vectorized,
+        in which case searches memoize the results of estimator.
+        Searches only ask for it on small or dense graphs, where a large share of the nodes is reached
+        """
+        return None
+
+
+class ZeroHeuristic(Heuristic):
+    """
+    Uninformed heuristic, searching with it is UCS
+    """
+    consistent = True
+
+    def estimate(self, node: Node, goal_node: Node) -> float:
+        return 0.0
+
+    def estimator(self, node_list: Sequence[Node], goal_index: int) -> Callable[[int], float]:
+        return lambda index: 0.0
+
+    def estimates(self, node_list: Sequence[Node], goal_index: int) -> array | None:
+        return array('d', bytes(8 * len(node_list)))
+
+
+class EuclideanHeuristic(Heuristic):
+    """
+    Straight-line distance between the node coordinates, admissible when no edge is shorter than it
+    """
+
+    def estimate(self, node: Node, goal_node: Node) -> float:
+        return distance_operations.euclidean_distance(node, goal_node)
+
+    def estimator(self, node_list: Sequence[Node], goal_index: int) -> Callable[[int], float]:
+        if not isinstance(node_list, NodeTable):
+            return super().estimator(node_list, goal_index)
+
+        # the coordinates are read straight from the node table, no Node objects are created
+        xs, ys = node_list.x, node_list.y
+        goal_x, goal_y = xs[goal_index], ys[goal_index]
+        return lambda index: math.hypot(xs[index] - goal_x, ys[index] - goal_y)
+
+    def estimates(self, node_list: Sequence[Node], goal_index: int) -> array | None:
+        if numpy is None or not isinstance(node_list, NodeTable) or len(node_list) == 0:
+            return None
+
+        xs = numpy.asarray(node_list.x, dtype=numpy.float64)
+        ys = numpy.asarray(node_list.y, dtype=numpy.float64)
+        return array('d', numpy.hypot(xs - xs[goal_index], ys - ys[goal_index]).tobytes())
+
+
+class GreatCircleHeuristic(Heuristic):
+    """
+    Great-circle distance in meters between latitude/longitude nodes,
+    consistent with edges weighted by their haversine distance
+    """
+    consistent = True
+
+    def estimate(self, node: Node, goal_node: Node) -> float:
+        return distance_operations.great_circle_distance(node, goal_node)
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import math
+import random
+import struct
+from array import array
+from typing import Callable, Sequence
+
+from src.algorithm.heuristics import Heuristic
+from src.algorithm.main_algorithm import Engine
+from src.io.section_file import SectionFile
+from src.model.graph import Graph
+from src.model.node import Node
+
+# file layout (little-endian):
+#   header      magic, format version, node count, landmark count
+#   fingerprint node count, edge count and digest of the graph the table was computed for
+#   landmarks   int32[landmark count]
+#   forward     float64[node count * landmark count]
+#   backward    float64[node count * landmark count]
+MAGIC = b'CMLM'
+VERSION = 2
+HEADER = struct.Struct('<4sIqq')
+
+LANDMARK_FILE_EXTENSION = '.clm'
+
+# number of landmarks selected when none is given, more landmarks give better estimates but slower ones
+DEFAULT_LANDMARK_COUNT = 16
+
+# landmark selection strategies
+FARTHEST = 'farthest'
+AVOID = 'avoid'
+
+
+class LandmarkTable:
+    """
+    Shortest route costs between a few landmarks and every node, the basis of the ALT heuristic.
+    The tables are stored node by node, the costs of node v are at positions v * k up to (v + 1) * k
+    for k landmarks. Forward costs lead from the landmarks to the nodes, backward costs from the nodes
+    to the landmarks. Unreachable nodes have infinite costs.
+    """
+
+    def __init__(self, landmarks: array, forward: array, backward: array):
+        self.landmarks = landmarks
+        self.forward = forward
+        self.backward = backward
+
+    def __len__(self) -> int:
+        return len(self.landmarks)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.forward) // len(self.landmarks) if len(self.landmarks) > 0 else 0
+
+    def lower_bound(self, source_index: int, target_index: int) -> float:
+        """
+        By the triangle inequality, d(L, t) - d(L, s) and d(s, L) - d(t, L) never exceed d(s, t) for a landmark L
+        :param source_index: index of the source node
+        :param target_index: index of the target node
+        :return: the best lower bound of the cost of the cheapest route from the source node to the target node
+        """
+        k = len(self.landmarks)
+        source_start, target_start = source_index * k, target_index * k
+        forward, backward = self.forward, self.backward
+
+        best = 0.0
+        for landmark_to_source, landmark_to_target, source_to_landmark, target_to_landmark in zip(
+                forward[source_start:source_start + k], forward[target_start:target_start + k],
+                backward[source_start:source_start + k], backward[target_start:target_start + k]):
+            # differences of infinite costs are skipped, they are either no bound or not a number
+            bound = landmark_to_target - landmark_to_source
+            if best < bound < math.inf:
+                best = bound
+            bound = source_to_landmark - target_to_landmark
+            if best < bound < math.inf:
+                best = bound
+
+        return best
+
+    @staticmethod
+    def __distances_to_all(graph: Graph, landmarks: list[int]) -> (list[array], list[array]):
+        reversed_graph = graph.reversed()
+        return ([Engine.shortest_path_tree(landmark, graph, cache=False).distances for landmark in landmarks],
+                [Engine.shortest_path_tree(landmark, reversed_graph, cache=False).distances for landmark in landmarks])
+
+    @staticmethod
+    def __farthest_node(forward_tables: list[array], backward_tables: list[array], node_count: int) -> int:
+        # the node whose round trip to its closest landmark is longest, unreachable nodes come first
+        best_index, best_distance = 0, -1.0
+        for i in range(node_count):
+            distance = min(forward[i] + backward[i] for forward, backward in zip(forward_tables, backward_tables))
+            if distance > best_distance:
+                best_index, best_distance = i, distance
+        return best_index
+
+    @staticmethod
+    def __avoid_node(graph: Graph, table: LandmarkTable, root_index: int) -> int:
+        # Goldberg and Werneck's "avoid": a node of the shortest path tree of a random root is weighted by how much
+        # the current landmarks underestimate its cost, subtrees holding a landmark weigh nothing,
+        # and the new landmark is the leaf reached by walking down the heaviest subtrees
+        tree = Engine.shortest_path_tree(root_index, graph, cache=False)
+        distances, predecessors = tree.distances, tree.predecessors
+        node_count = len(graph)
+
+        reachable = sorted((i for i in range(node_count) if distances[i] < math.inf),
+                           key=lambda i: distances[i], reverse=True)
+        sizes = array('d', bytes(8 * node_count))
+        has_landmark = bytearray(node_count)
+        for landmark in table.landmarks:
+            has_landmark[landmark] = 1
+        children: dict[int, list[int]] = {}
+
+        # children are processed before their parents, as they are farther from the root
+        for i in reachable:
+            if len(table) > 0:
+                sizes[i] += distances[i] - table.lower_bound(root_index, i)
+            else:
+                sizes[i] += distances[i]
+
+            parent = predecessors[i]
+            if parent != -1:
+                children.setdefault(parent, []).append(i)
+                sizes[parent] += sizes[i]
+                if has_landmark[i]:
+                    has_landmark[parent] = 1
+
+        for i in reachable:
+            if has_landmark[i]:
+                sizes[i] = 0.0
+
+        current_index = max(reachable, key=lambda i: sizes[i])
+        if sizes[current_index] <= 0.0:
+            return -1
+
+        while current_index in children:
+            current_index = max(children[current_index], key=lambda i: sizes[i])
+        return current_index
+
+    @staticmethod
+    def select(graph: Graph, landmark_count: int = DEFAULT_LANDMARK_COUNT, strategy: str = AVOID,
+               seed: int = 0) -> LandmarkTable:
+        """
+        Selects landmarks and computes their cost tables
+        :param graph: the graph
+        :param landmark_count: number of landmarks, at most the number of nodes
+        :param strategy: FARTHEST picks the node farthest from the landmarks selected so far,
+        AVOID picks the node in the region where the current landmarks give the weakest estimates
+        :param seed: seed of the random choices
+        :return: the landmark table
+        """
+        if strategy not in (FARTHEST, AVOID):
+            raise ValueError(f"Unknown landmark selection strategy '{strategy}'.")
+
+        node_count = len(graph)
+        landmark_count = min(landmark_count, node_count)
+        generator = random.Random(seed)
+
+        landmarks: list[int] = []
+        forward_tables: list[array] = []
+        backward_tables: list[array] = []
+        table = LandmarkTable(array('i'), array('d'), array('d'))
+
+        while len(landmarks) < landmark_count:
+            landmark = -1
+            if strategy == AVOID:
+                landmark = LandmarkTable.__avoid_node(graph, table, generator.randrange(node_count))
+
+            if landmark == -1 or landmark in landmarks:
+                if len(landmarks) == 0:
+                    # the first landmark is the node farthest from a random node
+                    landmark = LandmarkTable.__farthest_node(
+                        *LandmarkTable.__distances_to_all(graph, [generator.randrange(node_count)]), node_count)
+                else:
+                    landmark = LandmarkTable.__farthest_node(forward_tables, backward_tables, node_count)
+
+            forward, backward = LandmarkTable.__distances_to_all(graph, [landmark])
+            landmarks.append(landmark)
+            forward_tables += forward
+            backward_tables += backward
+
+            if strategy == AVOID:
+                table = LandmarkTable.from_tables(landmarks, forward_tables, backward_tables)
+
+        return LandmarkTable.from_tables(landmarks, forward_tables, backward_tables)
+
+    @staticmethod
+    def from_tables(landmarks: list[int], forward_tables: list[array], backward_tables: list[array]) -> LandmarkTable:
+        """
+        :param landmarks: indices of the landmarks
+        :param forward_tables: costs from every landmark to every node, one table per landmark
+        :param backward_tables: costs from every node to every landmark, one table per landmark
+        :return: the landmark table, stored node by node
+        """
+        forward = array('d')
+        backward = array('d')
+        if len(landmarks) > 0:
+            for costs in zip(*forward_tables):
+                forward.extend(costs)
+            for costs in zip(*backward_tables):
+                backward.extend(costs)
+        return LandmarkTable(array('i', landmarks), forward, backward)
+
+    def save(self, path: str, graph: Graph) -> None:
+        """
+        :param path: path to the landmark file
+        :param graph: the graph the table was computed for, its fingerprint is stored with the table
+        """
+        sections = [array('i', self.landmarks), array('d', self.forward), array('d', self.backward)]
+
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.node_count, len(self.landmarks)))
+            file.write(SectionFile.graph_fingerprint(graph))
+            SectionFile.write_sections(file, sections)
+
+    @staticmethod
+    def load(path: str, graph: Graph = None) -> LandmarkTable:
+        """
+        :param path: path to the landmark file
+        :param graph: the graph the table is used with, checked against the stored fingerprint if given,
+        the lower bounds of a table computed for another graph are wrong
+        :return: the landmark table
+        :raises RuntimeError: if the file is invalid or was computed for a different graph
+        """
+        with open(path, 'rb') as file:
+            header = file.read(HEADER.size)
+            if len(header) != HEADER.size:
+                raise RuntimeError("Error while processing file.")
+
+            magic, version, node_count, landmark_count = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION or node_count < 0 or landmark_count < 0:
+                raise RuntimeError("Error while processing file.")
+            if graph is not None and node_count != graph.node_count:
+                raise RuntimeError("The file was built for a different graph.")
+            SectionFile.read_fingerprint(file, graph)
+
+            landmarks = SectionFile.read_section(file, 'i', landmark_count)
+            forward = SectionFile.read_section(file, 'd', node_count * landmark_count)
+            backward = SectionFile.read_section(file, 'd', node_count * landmark_count)
+
+        return LandmarkTable(landmarks, forward, backward)
+
+
+class LandmarkHeuristic(Heuristic):
+    """
+    ALT heuristic, the best landmark lower bound of the remaining cost.
+    It is consistent whatever the edge weights mean, so A* with it always finds the optimal route.
+    The node ids must be the node indices of the graph the table was computed for.
+    """
+    consistent = True
+
+    def __init__(self, table: LandmarkTable):
+        self.table = table
+
+    def estimate(self, node: Node, goal_node: Node) -> float:
+        return self.table.lower_bound(node.node_id, goal_node.node_id)
+
+    def estimator(self, node_list: Sequence[Node], goal_index: int) -> Callable[[int], float]:
+        lower_bound = self.table.lower_bound
+        return lambda index: lower_bound(index, goal_index)
+
+    def estimator_from(self, node_list: Sequence[Node], start_index: int) -> Callable[[int], float]:
+        # the landmark bounds are directed, the backward search needs the bound from the starting node
+        lower_bound = self.table.lower_bound
+        return lambda index: lower_bound(start_index, index)
@@ -1,77 +1,408 @@
+from __future__ import annotations
+
 import heapq
+import math
+from array import array
+from collections import OrderedDict
+from typing import Callable, Sequence
 
-from src.common import distance_operations
+from src.algorithm.heuristics import EuclideanHeuristic, Heuristic, ZeroHeuristic
+from src.algorithm.search_stats import SEARCH, TRACE, SearchStats
+from src.algorithm.shortest_path_tree import ShortestPathTree, ShortestPathTreeCache
+from src.model.graph import Graph
 from src.model.node import Node
 
 
+# heuristic estimates of every node are computed at once for graphs up to this many nodes,
+# and for graphs with at least this fraction of all possible edges, otherwise they are memoized node by node
+VECTORIZED_ESTIMATES_MAX_NODES = 4096
+DENSE_EDGE_FRACTION = 0.05
+
+# number of starting nodes remembered by Engine.search_repeated_ucs
+UCS_SOURCES_CAPACITY = 4096
+
+
 class Engine:
-    @staticmethod
-    def __heuristic(informed: bool, start_node: Node = None, goal_node: Node = None) -> float:
-        if not informed:
-            return 0
-        return distance_operations.euclidean_distance(start_node, goal_node)
+    # number of nodes expanded by the last search
+    expansions: int = 0
+
+    # counters and phase times of the last search
+    stats: SearchStats = SearchStats()
+
+    # called with the index of every expanded node, e.g. to trace or animate a search
+    on_expand: Callable[[int], None] | None = None
+
+    # recently computed shortest path trees
+    tree_cache: ShortestPathTreeCache = ShortestPathTreeCache()
+
+    # (graph version, start index) of the latest UCS queries of search_repeated_ucs, at most UCS_SOURCES_CAPACITY
+    ucs_sources: OrderedDict[tuple[int, int], None] = OrderedDict()
 
     @staticmethod
-    def __trace_path(dijkstra_table: list[(float, int)], node_list: list[Node],
+    def __trace_path(g_scores: array, parents: array, node_list: Sequence[Node],
                      goal_index: int) -> (float, list[Node]):
         current_index = goal_index
         path: list[Node] = []
-        cost: float = dijkstra_table[goal_index][0]
+        cost: float = g_scores[goal_index]
 
         while current_index != -1:
             path.append(node_list[current_index])
-            current_index = dijkstra_table[current_index][1]
+            current_index = parents[current_index]
 
         path.reverse()
         return cost, path
 
     @staticmethod
-    def search_path(start_index: int, goal_index: int, informed: bool,
-                    node_list: list[Node], adj_matrix: list[list[float]]) -> (float, list[Node]):
+    def __trace_meeting_path(parents: tuple[array, array], meeting_index: int, node_list: Sequence[Node],
+                             graph: Graph) -> (float, list[Node]):
+        # forward half up to the meeting node, then the backward half down to the destination node
+        path_indices: list[int] = []
+        current_index = meeting_index
+        while current_index != -1:
+            path_indices.append(current_index)
+            current_index = parents[0][current_index]
+        path_indices.reverse()
+
+        current_index = parents[1][meeting_index]
+        while current_index != -1:
+            path_indices.append(current_index)
+            current_index = parents[1][current_index]
+
+        cost = 0.0
+        for first_index, second_index in zip(path_indices, path_indices[1:]):
+            cost += graph.weight(first_index, second_index)
+
+        return cost, [node_list[i] for i in path_indices]
+
+    @staticmethod
+    def __record(stats: SearchStats, expansions: int, relaxed: int, pushes: int, pops: int, stale_pops: int,
+                 peak_queue_size: int) -> None:
+        # the counters are kept in local variables during a search and stored once at the end
+        stats.expanded = expansions
+        stats.relaxed = relaxed
+        stats.pushes = pushes
+        stats.pops = pops
+        stats.stale_pops = stale_pops
+        stats.peak_queue_size = peak_queue_size
+
+    @staticmethod
+    def __estimates(heuristic: Heuristic, node_list: Sequence[Node], goal_index: int, graph: Graph) -> array:
+        # estimates of the heuristic for the whole query, NaN marks an estimate which is memoized on first use.
+        # Every estimate is computed at once only when the search is expected to reach a large share of the nodes,
+        # on small graphs and on dense graphs, a point query on a big sparse graph estimates a few nodes only
+        node_count = len(graph)
+        if node_count <= VECTORIZED_ESTIMATES_MAX_NODES or \
+                graph.edge_count >= DENSE_EDGE_FRACTION * node_count * node_count:
+            estimates = heuristic.estimates(node_list, goal_index)
+            if estimates is not None:
+                return estimates
+        return array('d', [math.nan]) * node_count
+
+    @staticmethod
+    def search_path(start_index: int, goal_index: int, heuristic: Heuristic,
+                    node_list: Sequence[Node], graph: Graph) -> (float, list[Node]):
+        """
+        A* search, which is Dijkstra's algorithm (UCS) with the zero heuristic.
+        The returned route is optimal as long as the heuristic never overestimates the remaining cost.
+        With a consistent heuristic an expanded node is never expanded again,
+        otherwise a node is reopened whenever a shorter route to it is found.
+        The search works on node indices, Node objects are only looked up for the returned route.
+        :param start_index: index of the starting node
+        :param goal_index: index of the destination node
+        :param heuristic: estimates the remaining cost from a node to the destination node
+        :param node_list: the list of nodes
+        :param graph: the graph
+        :return: the cost and the list of nodes of the route, or None if there is no route
+        """
+        Engine.expansions = 0
+        Engine.stats = stats = SearchStats()
         if start_index == goal_index:
-            return adj_matrix[start_index][goal_index], [node_list[start_index]]
+            return 0.0, [node_list[start_index]]
 
-        # format: (shortest distance, source node id)
-        dijkstra_table = [(-1.0, 0) for _ in range(len(node_list))]
-        dijkstra_table[start_index] = (Engine.__heuristic(informed, node_list[start_index], node_list[goal_index]), -1)
+        consistent = heuristic.consistent
+        on_expand = Engine.on_expand
+        offsets = graph.offsets
+        estimate = heuristic.estimator(node_list, goal_index)
+        node_count = len(graph)
+
+        # estimated remaining cost of every node, computed once per query
+        estimates = Engine.__estimates(heuristic, node_list, goal_index, graph)
+
+        # cost of the shortest known route from the starting node to every node
+        g_scores = array('d', [math.inf]) * node_count
+        # previous node on that route
+        parents = array('q', [-1]) * node_count
+        # nodes which have been expanded with their current g-score
+        settled = bytearray(node_count)
+
+        g_scores[start_index] = 0.0
 
         queue = []
-        # format: (shortest distance, node)
-        heapq.heappush(queue,
-                       (Engine.__heuristic(informed, node_list[start_index], node_list[goal_index]), start_index))
+        # format: (g-score + heuristic, g-score, node index)
+        heapq.heappush(queue, (estimate(start_index), 0.0, start_index))
+
+        found = False
+        expansions = relaxed = pops = stale_pops = 0
+        pushes = peak_queue_size = 1
+        with stats.phase(SEARCH):
+            while len(queue) > 0:
+                _, g_score, node_index = heapq.heappop(queue)
+                pops += 1
+
+                # stale entry, the node has been pushed again with a lower g-score
+                if settled[node_index] or g_score > g_scores[node_index]:
+                    stale_pops += 1
+                    continue
+
+                # found goal
+                if node_index == goal_index:
+                    found = True
+                    break
+
+                settled[node_index] = 1
+                expansions += 1
+                relaxed += offsets[node_index + 1] - offsets[node_index]
+                if on_expand is not None:
+                    on_expand(node_index)
+
+                for i, weight in graph.neighbours_of(node_index):
+                    # with a consistent heuristic an expanded node already has its shortest route
+                    if consistent and settled[i]:
+                        continue
+
+                    new_g_score = g_score + weight
+                    if new_g_score < g_scores[i]:
+                        g_scores[i] = new_g_score
+                        parents[i] = node_index
+                        settled[i] = 0  # reopen the node
+
+                        h_score = estimates[i]
+                        if h_score != h_score:  # not estimated yet
+                            h_score = estimates[i] = estimate(i)
+                        heapq.heappush(queue, (new_g_score + h_score, new_g_score, i))
+                        pushes += 1
+                        if len(queue) > peak_queue_size:
+                            peak_queue_size = len(queue)
 
-        while len(queue) > 0:
-            node_index: int = heapq.heappop(queue)[1]
-            current_node: Node = node_list[node_index]
+        Engine.expansions = expansions
+        Engine.__record(stats, expansions, relaxed, pushes, pops, stale_pops, peak_queue_size)
+        if not found:
+            return None
 
-            # found goal
-            if current_node == node_list[goal_index]:
-                return Engine.__trace_path(dijkstra_table, node_list, goal_index)
+        with stats.phase(TRACE):
+            return Engine.__trace_path(g_scores, parents, node_list, goal_index)
 
-            for i, weight in enumerate(adj_matrix[node_index]):
-                # just to make sure :)
-                if -0.0001 <= adj_matrix[node_index][i] <= 0.0001:
+    @staticmethod
+    def search_astar(start_index: int, goal_index: int, node_list: Sequence[Node],
+                     graph: Graph, heuristic: Heuristic = None) -> (float, list[Node]):
+        if heuristic is None:
+            heuristic = EuclideanHeuristic()
+        return Engine.search_path(start_index, goal_index, heuristic, node_list, graph)
+
+    @staticmethod
+    def search_ucs(start_index: int, goal_index: int, node_list: Sequence[Node],
+                   graph: Graph) -> (float, list[Node]):
+        return Engine.search_path(start_index, goal_index, ZeroHeuristic(), node_list, graph)
+
+    @staticmethod
+    def search_bidirectional(start_index: int, goal_index: int, node_list: Sequence[Node],
+                             graph: Graph, heuristic: Heuristic = None) -> (float, list[Node]):
+        """
+        Bidirectional search, forward from the starting node and backward from the destination node over the
+        reversed graph until the two searches meet.
+        A consistent heuristic turns it into bidirectional A* with the average of the forward and backward
+        estimates as potential, otherwise it is bidirectional Dijkstra.
+        :param start_index: index of the starting node
+        :param goal_index: index of the destination node
+        :param node_list: the list of nodes
+        :param graph: the graph
+        :param heuristic: estimates the remaining cost between two nodes
+        :return: the cost and the list of nodes of the route, or None if there is no route
+        """
+        Engine.expansions = 0
+        Engine.stats = stats = SearchStats()
+        if start_index == goal_index:
+            return 0.0, [node_list[start_index]]
+
+        on_expand = Engine.on_expand
+        if heuristic is None or not heuristic.consistent:
+            heuristic = ZeroHeuristic()
+        estimate = heuristic.estimator(node_list, goal_index)
+        estimate_from = heuristic.estimator_from(node_list, start_index)
+
+        node_count = len(graph)
+        potentials = array('d', [math.nan]) * node_count
+
+        def potential(index: int) -> float:
+            value = potentials[index]
+            if value != value:  # not computed yet
+                value = (estimate(index) - estimate_from(index)) / 2
+                potentials[index] = value
+            return value
+
+        # index 0 holds the forward search, index 1 the backward search
+        graphs = (graph, graph.reversed())
+        directions = (1, -1)
+        distances = (array('d', [math.inf]) * node_count, array('d', [math.inf]) * node_count)
+        parents = (array('q', [-1]) * node_count, array('q', [-1]) * node_count)
+        settled = (bytearray(node_count), bytearray(node_count))
+        queues = ([(0.0, start_index)], [(0.0, goal_index)])
+
+        distances[0][start_index] = 0.0
+        distances[1][goal_index] = 0.0
+
+        # cost of the best route found so far (with reduced weights) and the node where its two halves meet
+        best_cost = math.inf
+        meeting_index = -1
+
+        expansions = relaxed = pops = stale_pops = 0
+        pushes = peak_queue_size = 2
+        with stats.phase(SEARCH):
+            while len(queues[0]) > 0 and len(queues[1]) > 0:
+                if queues[0][0][0] + queues[1][0][0] >= best_cost:
+                    break
+
+                side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+                distance, node_index = heapq.heappop(queues[side])
+                pops += 1
+
+                # stale entry, the node has been pushed again with a lower distance
+                if settled[side][node_index] or distance > distances[side][node_index]:
+                    stale_pops += 1
                     continue
 
-                node = node_list[i]
+                settled[side][node_index] = 1
+                expansions += 1
+                relaxed += graphs[side].offsets[node_index + 1] - graphs[side].offsets[node_index]
+                if on_expand is not None:
+                    on_expand(node_index)
+
+                side_distances = distances[side]
+                other_distances = distances[1 - side]
+                direction = directions[side]
+                node_potential = potential(node_index)
 
-                weight = dijkstra_table[current_node.node_id][0]
-                weight += adj_matrix[node_index][i]
-                weight += Engine.__heuristic(informed, node, node_list[goal_index])
-                weight -= Engine.__heuristic(informed, current_node, node_list[goal_index])
+                for i, weight in graphs[side].neighbours_of(node_index):
+                    # reduced weight, never negative for a consistent heuristic
+                    new_distance = distance + weight + direction * (potential(i) - node_potential)
+                    if new_distance < side_distances[i]:
+                        side_distances[i] = new_distance
+                        parents[side][i] = node_index
+                        heapq.heappush(queues[side], (new_distance, i))
+                        pushes += 1
+                        if len(queues[0]) + len(queues[1]) > peak_queue_size:
+                            peak_queue_size = len(queues[0]) + len(queues[1])
 
-                if dijkstra_table[node.node_id][0] > weight or dijkstra_table[node.node_id][0] == -1:
-                    dijkstra_table[node.node_id] = (weight, current_node.node_id)
-                    heapq.heappush(queue, (weight, node.node_id))
+                    if side_distances[i] + other_distances[i] < best_cost:
+                        best_cost = side_distances[i] + other_distances[i]
+                        meeting_index = i
 
-        return None
+        Engine.expansions = expansions
+        Engine.__record(stats, expansions, relaxed, pushes, pops, stale_pops, peak_queue_size)
+        if meeting_index == -1:
+            return None
+
+        with stats.phase(TRACE):
+            return Engine.__trace_meeting_path(parents, meeting_index, node_list, graph)
 
     @staticmethod
-    def search_astar(start_index: int, goal_index: int, node_list: list[Node],
-                     adj_matrix: list[list[float]]) -> (float, list[Node]):
-        return Engine.search_path(start_index, goal_index, True, node_list, adj_matrix)
+    def shortest_path_tree(start_index: int, graph: Graph, cache: bool = True) -> ShortestPathTree:
+        """
+        Runs Dijkstra's algorithm from the starting node to every node
+        :param start_index: index of the starting node
+        :param graph: the graph
+        :param cache: whether the tree is looked up in and stored in Engine.tree_cache
+        :return: the shortest path tree of the starting node
+        """
+        Engine.expansions = 0
+        Engine.stats = stats = SearchStats()
+        tree = Engine.tree_cache.get(graph.version, start_index) if cache else None
+        if tree is not None:
+            return tree
+
+        on_expand = Engine.on_expand
+        offsets = graph.offsets
+        node_count = len(graph)
+        distances = array('d', [math.inf]) * node_count
+        predecessors = array('q', [-1]) * node_count
+        settled = bytearray(node_count)
+
+        distances[start_index] = 0.0
+
+        queue = [(0.0, start_index)]
+        expansions = relaxed = pops = stale_pops = 0
+        pushes = peak_queue_size = 1
+        with stats.phase(SEARCH):
+            while len(queue) > 0:
+                distance, node_index = heapq.heappop(queue)
+                pops += 1
+
+                # stale entry, the node has been pushed again with a lower distance
+                if settled[node_index]:
+                    stale_pops += 1
+                    continue
+
+                settled[node_index] = 1
+                expansions += 1
+                relaxed += offsets[node_index + 1] - offsets[node_index]
+                if on_expand is not None:
+                    on_expand(node_index)
+
+                for i, weight in graph.neighbours_of(node_index):
+                    if settled[i]:
+                        continue
+
+                    new_distance = distance + weight
+                    if new_distance < distances[i]:
+                        distances[i] = new_distance
+                        predecessors[i] = node_index
+                        heapq.heappush(queue, (new_distance, i))
+                        pushes += 1
+                        if len(queue) > peak_queue_size:
+                            peak_queue_size = len(queue)
+
+        Engine.expansions = expansions
+        Engine.__record(stats, expansions, relaxed, pushes, pops, stale_pops, peak_queue_size)
+        tree = ShortestPathTree(start_index, distances, predecessors)
+        if cache:
+            Engine.tree_cache.put(graph.version, tree)
+        return tree
+
+    @staticmethod
+    def trace_tree_path(tree: ShortestPathTree, node_list: Sequence[Node], goal_index: int) -> (float, list[Node]):
+        """
+        :param tree: a shortest path tree
+        :param node_list: the list of nodes
+        :param goal_index: index of the destination node
+        :return: the cost and the list of nodes of the route from the source of the tree, or None if there is no route
+        """
+        if tree.distances[goal_index] == math.inf:
+            return None
+        with Engine.stats.phase(TRACE):
+            return Engine.__trace_path(tree.distances, tree.predecessors, node_list, goal_index)
 
     @staticmethod
-    def search_ucs(start_index: int, goal_index: int, node_list: list[Node],
-                   adj_matrix: list[list[float]]) -> (float, list[Node]):
-        return Engine.search_path(start_index, goal_index, False, node_list, adj_matrix)
+    def search_tree(start_index: int, goal_index: int, node_list: Sequence[Node],
+                    graph: Graph) -> (float, list[Node]):
+        """
+        UCS answered from the (cached) shortest path tree of the starting node,
+        later searches from the same starting node do not search at all
+        """
+        return Engine.trace_tree_path(Engine.shortest_path_tree(start_index, graph), node_list, goal_index)
+
+    @staticmethod
+    def search_repeated_ucs(start_index: int, goal_index: int, node_list: Sequence[Node],
+                            graph: Graph) -> (float, list[Node]):
+        """
+        UCS which stops at the destination node the first time a starting node is queried,
+        and builds (or reuses) the shortest path tree of the starting node once it is queried again
+        """
+        source_key = (graph.version, start_index)
+        if source_key in Engine.ucs_sources:
+            Engine.ucs_sources.move_to_end(source_key)
+            return Engine.search_tree(start_index, goal_index, node_list, graph)
+
+        Engine.ucs_sources[source_key] = None
+        if len(Engine.ucs_sources) > UCS_SOURCES_CAPACITY:
+            Engine.ucs_sources.popitem(last=False)
+        return Engine.search_ucs(start_index, goal_index, node_list, graph)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+# phases of answering a query, in the order they happen
+LOAD = 'load'
+BUILD = 'build'
+SEARCH = 'search'
+TRACE = 'trace'
+PHASES = (LOAD, BUILD, SEARCH, TRACE)
+
+
+class SearchStats:
+    """
+    Counters and timings of a search, used to compare algorithms and to catch performance regressions.
+    A node is expanded when its outgoing edges are relaxed, relaxed counts those edges.
+    A pop is stale when its node was pushed again with a lower cost or was already expanded.
+    """
+
+    def __init__(self):
+        self.expanded = 0
+        self.relaxed = 0
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.peak_queue_size = 0
+        # wall time in seconds of every phase which has been timed
+        self.phase_times: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Times a phase, the time is added to earlier times of the same phase
+        :param name: name of the phase, usually one of LOAD, BUILD, SEARCH and TRACE
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + time.perf_counter() - start_time
+
+    def to_dict(self) -> dict:
+        """
+        :return: the counters and the phase times, ready to be written as JSON
+        """
+        return {
+            'expanded': self.expanded,
+            'relaxed': self.relaxed,
+            'pushes': self.pushes,
+            'pops': self.pops,
+            'stale_pops': self.stale_pops,
+            'peak_queue_size': self.peak_queue_size,
+            'phase_times': dict(self.phase_times),
+        }
+
+    def __str__(self):
+        lines = [f'Expanded: {self.expanded}   Relaxed: {self.relaxed}   Pushes: {self.pushes}   '
+                 f'Pops: {self.pops} ({self.stale_pops} stale)   Peak queue: {self.peak_queue_size}']
+        if len(self.phase_times) > 0:
+            # phases in the order they happen, other phases after them
+            phases = sorted(self.phase_times, key=lambda name: PHASES.index(name) if name in PHASES else len(PHASES))
+            lines.append('   '.join(f'{name.capitalize()}: {self.phase_times[name] * 1000:.3f} ms' for name in phases))
+        return '\n'.join(lines)
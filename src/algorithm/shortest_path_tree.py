@@ -0,0 +1,64 @@
+from array import array
+from collections import OrderedDict
+
+
+class ShortestPathTree:
+    """
+    Shortest routes from one source node to every node of a graph
+    """
+
+    def __init__(self, source_index: int, distances: array, predecessors: array):
+        self.source_index = source_index
+        self.distances = distances  # cost of the shortest route to every node, infinity if unreachable
+        self.predecessors = predecessors  # previous node on that route, -1 for the source and unreachable nodes
+
+
+# default memory budget of a tree cache, a tree takes 16 bytes per node of its graph,
+# so the budget holds 16 trees of a 256k node graph or a single tree of a bigger graph
+TREE_CACHE_MAX_BYTES = 64 << 20
+
+
+class ShortestPathTreeCache:
+    """
+    Least recently used cache of shortest path trees, keyed by graph version and source node.
+    Trees are evicted once there are more than capacity trees or they take more than max_bytes,
+    the most recently stored tree is always kept.
+    """
+
+    def __init__(self, capacity: int = 16, max_bytes: int = TREE_CACHE_MAX_BYTES):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.size = 0  # bytes taken by the cached trees
+        self.trees: OrderedDict[tuple[int, int], ShortestPathTree] = OrderedDict()
+
+    @staticmethod
+    def tree_size(tree: ShortestPathTree) -> int:
+        """
+        :param tree: a shortest path tree
+        :return: the number of bytes taken by the arrays of the tree
+        """
+        return (len(tree.distances) * tree.distances.itemsize +
+                len(tree.predecessors) * tree.predecessors.itemsize)
+
+    def get(self, graph_version: int, source_index: int) -> ShortestPathTree | None:
+        key = (graph_version, source_index)
+        tree = self.trees.get(key)
+        if tree is not None:
+            self.trees.move_to_end(key)
+        return tree
+
+    def put(self, graph_version: int, tree: ShortestPathTree) -> None:
+        key = (graph_version, tree.source_index)
+        if key in self.trees:
+            self.size -= ShortestPathTreeCache.tree_size(self.trees[key])
+        self.trees[key] = tree
+        self.trees.move_to_end(key)
+        self.size += ShortestPathTreeCache.tree_size(tree)
+
+        while len(self.trees) > 1 and (len(self.trees) > self.capacity or self.size > self.max_bytes):
+            _, evicted_tree = self.trees.popitem(last=False)
+            self.size -= ShortestPathTreeCache.tree_size(evicted_tree)
+
+    def clear(self) -> None:
+        self.trees.clear()
+        self.size = 0
@@ -0,0 +1,213 @@
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Sequence, TextIO
+
+from src.algorithm.all_pairs import AllPairs
+from src.algorithm.batch_search import BatchSearch
+from src.algorithm.contraction_hierarchy import ContractionHierarchy
+from src.algorithm.landmarks import LandmarkTable
+from src.algorithm.search_stats import BUILD, LOAD, SearchStats
+from src.io.file_handler import FileInputHandler
+from src.model.graph import Graph
+from src.model.node import Node
+
+
+class QueryRunner:
+    @staticmethod
+    def parse_queries(lines: Iterable[str]) -> Iterator[tuple[int, int, str] | dict]:
+        """
+        Parses "start goal algorithm" lines, blank lines and lines starting with # are skipped
+        :param lines: the query lines
+        :return: an iterator of (start index, goal index, algorithm) queries,
+        or of the line and an error message for lines which are not queries
+        """
+        for line in lines:
+            tokens = line.split()
+            if len(tokens) == 0 or tokens[0].startswith('#'):
+                continue
+
+            try:
+                if len(tokens) != 3:
+                    raise ValueError("Expected 'start goal algorithm'.")
+                yield int(tokens[0]), int(tokens[1]), tokens[2]
+            except ValueError as error:
+                yield {'query': line.strip(), 'error': str(error)}
+
+    @staticmethod
+    @contextmanager
+    def loading(path: str) -> Iterator[None]:
+        """
+        Names the file in the errors raised while it is loaded inside the context
+        :param path: path to the file
+        :raises RuntimeError: if the file is missing or invalid
+        """
+        try:
+            yield
+        except (FileNotFoundError, RuntimeError) as error:
+            raise RuntimeError(f"Could not load {path}: {error}") from error
+
+    @staticmethod
+    def load_hierarchy(hierarchy_path: str, graph: Graph) -> ContractionHierarchy:
+        """
+        :param hierarchy_path: path to the contraction hierarchy file
+        :param graph: the graph, whose hierarchy is built and saved if the hierarchy file is missing
+        :return: the contraction hierarchy
+        :raises RuntimeError: if the hierarchy file was built for a different graph
+        """
+        if os.path.exists(hierarchy_path):
+            # a hierarchy built for another graph would give wrong routes, it is rejected with a RuntimeError
+            return ContractionHierarchy.load(hierarchy_path, graph)
+
+        hierarchy = ContractionHierarchy.build(graph)
+        hierarchy.save(hierarchy_path, graph)
+        return hierarchy
+
+    @staticmethod
+    def load_landmarks(landmarks_path: str, graph: Graph) -> LandmarkTable:
+        """
+        :param landmarks_path: path to the landmark file
+        :param graph: the graph, whose landmarks are selected and saved if the landmark file is missing
+        :return: the landmark table
+        :raises RuntimeError: if the landmark file was computed for a different graph
+        """
+        if os.path.exists(landmarks_path):
+            # the lower bounds of landmarks selected on another graph are wrong, they are rejected with a RuntimeError
+            return LandmarkTable.load(landmarks_path, graph)
+
+        landmarks = LandmarkTable.select(graph)
+        landmarks.save(landmarks_path, graph)
+        return landmarks
+
+    @staticmethod
+    def run(graph_path: str, queries: Iterable[str], output: TextIO, workers: int = None,
+            hierarchy_path: str = None, landmarks_path: str = None) -> SearchStats:
+        """
+        Answers queries, one JSON object is written per query as soon as it is answered.
+        The queries are streamed, also when they are answered by worker processes.
+        :param graph_path: path to the graph file
+        :param queries: the query lines
+        :param output: where the results are written
+        :param workers: number of worker processes, the queries are answered in this process if None
+        :param hierarchy_path: path to the contraction hierarchy file used by "ch" queries
+        :param landmarks_path: path to the landmark file used by "alt" queries
+        :return: the times spent loading the graph and building (or loading) the hierarchy and the landmarks,
+        the statistics of every query are written with its result
+        """
+        parsed_queries = QueryRunner.parse_queries(queries)
+        run_stats = SearchStats()
+
+        # The graph is loaded once, for the hierarchy, the landmarks and the queries
+        with run_stats.phase(LOAD), QueryRunner.loading(graph_path):
+            node_list, graph = FileInputHandler.load_file(graph_path)
+
+        hierarchy = None
+        landmarks = None
+        with run_stats.phase(BUILD):
+            if hierarchy_path is not None:
+                with QueryRunner.loading(hierarchy_path):
+                    hierarchy = QueryRunner.load_hierarchy(hierarchy_path, graph)
+            if landmarks_path is not None:
+                with QueryRunner.loading(landmarks_path):
+                    landmarks = QueryRunner.load_landmarks(landmarks_path, graph)
+
+        if workers is None:
+            results = (query if isinstance(query, dict)
+                       else BatchSearch.search(*query, node_list, graph, hierarchy, landmarks)
+                       for query in parsed_queries)
+        else:
+            results = QueryRunner.__search_in_workers(parsed_queries, graph_path, node_list, graph, workers,
+                                                      hierarchy_path, landmarks_path)
+
+        for result in results:
+            output.write(json.dumps(result) + '\n')
+            output.flush()
+
+        return run_stats
+
+    @staticmethod
+    def __search_in_workers(parsed_queries: Iterator[tuple[int, int, str] | dict], graph_path: str,
+                            node_list: Sequence[Node], graph: Graph, workers: int, hierarchy_path: str | None,
+                            landmarks_path: str | None) -> Iterator[tuple[int, int, str] | dict]:
+        # Lines which are not queries wait in line with the queries sent to the workers,
+        # so the results stay in input order while only the queries in flight are held in memory
+        pending: deque[tuple[int, int, str] | dict] = deque()
+
+        def queries_to_search() -> Iterator[tuple[int, int, str]]:
+            for query in parsed_queries:
+                pending.append(query)
+                if not isinstance(query, dict):
+                    yield query
+
+        answers = BatchSearch.search_all(queries_to_search(), graph_path, workers, hierarchy_path=hierarchy_path,
+                                         landmarks_path=landmarks_path, node_list=node_list, graph=graph)
+        for answer in answers:
+            while isinstance(pending[0], dict):
+                yield pending.popleft()
+            pending.popleft()
+            yield answer
+
+        yield from pending
+
+
+def positive_int(value: str) -> int:
+    """
+    :param value: a command line argument
+    :return: the argument as a positive integer
+    :raises argparse.ArgumentTypeError: if the argument is not a positive integer
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got '{value}'")
+    return number
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='compass',
+                                     description='Answer shortest route queries without the GUI. '
+                                                 'Results are written as JSON lines.')
+    parser.add_argument('graph', help='path to the graph file')
+    parser.add_argument('-q', '--queries', type=argparse.FileType('r'), default=sys.stdin,
+                        help='file of "start goal algorithm" lines, read from standard input by default')
+    parser.add_argument('-w', '--workers', type=positive_int, default=None,
+                        help='answer the queries in this many worker processes')
+    parser.add_argument('--all-pairs', metavar='DIRECTORY', default=None,
+                        help='instead of answering queries, write the all-pairs distance matrix and predecessor '
+                             'matrix of the graph to DIRECTORY as .npy files')
+    parser.add_argument('--hierarchy', metavar='FILE', default=None,
+                        help='contraction hierarchy file used by "ch" queries, built from the graph and saved '
+                             'if it does not exist')
+    parser.add_argument('--landmarks', metavar='FILE', default=None,
+                        help='landmark file used by "alt" queries, selected from the graph and saved '
+                             'if it does not exist')
+    parser.add_argument('--stats', action='store_true',
+                        help='write the time spent loading the graph and building the hierarchy and the landmarks '
+                             'to standard error')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.all_pairs is not None:
+            with QueryRunner.loading(args.graph):
+                AllPairs.compute(args.graph, args.all_pairs, args.workers)
+        else:
+            run_stats = QueryRunner.run(args.graph, args.queries, sys.stdout, args.workers, args.hierarchy,
+                                        args.landmarks)
+            if args.stats:
+                print(json.dumps({'phase_times': run_stats.phase_times}), file=sys.stderr)
+    except RuntimeError as error:
+        # the error names the file which could not be loaded
+        print(error, file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
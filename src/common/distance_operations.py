@@ -1,9 +1,19 @@
 import math
 
-from geopy.distance import distance
-
 from src.model.node import Node
 
+try:
+    import numpy
+except ImportError:  # the haversine distances are computed one by one instead
+    numpy = None
+
+# Mean radius of the Earth, used for haversine edge weights
+EARTH_RADIUS = 6371008.8
+
+# Radius of the great-circle heuristic. It is slightly smaller than the radius of the edge weights so that
+# floating point rounding never makes an estimate longer than the haversine weight of the same path.
+GREAT_CIRCLE_RADIUS = EARTH_RADIUS * 0.9999
+
 
 def euclidean_distance(first_node: Node, second_node: Node) -> float:
     """
@@ -14,10 +24,42 @@ def euclidean_distance(first_node: Node, second_node: Node) -> float:
     return math.sqrt(math.pow(first_node.y - second_node.y, 2) + math.pow(first_node.x - second_node.x, 2))
 
 
-def geodesic_distance(first_coords: tuple[float, float], second_coords: tuple[float, float]) -> float:
+def great_circle_distance(first_node: Node, second_node: Node) -> float:
+    """
+    :param first_node: the first node, x is the latitude and y is the longitude
+    :param second_node: the second node, x is the latitude and y is the longitude
+    :return: the great-circle distance between the two nodes (in meters), which never exceeds the haversine
+        weight of a path between them
+    """
+    first_latitude = math.radians(first_node.x)
+    second_latitude = math.radians(second_node.x)
+    sin_latitude = math.sin((second_latitude - first_latitude) / 2)
+    sin_longitude = math.sin(math.radians(second_node.y - first_node.y) / 2)
+
+    a = sin_latitude * sin_latitude + math.cos(first_latitude) * math.cos(second_latitude) * sin_longitude * sin_longitude
+    return 2 * GREAT_CIRCLE_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def haversine_distances(first_coords: list[tuple[float, float]],
+                        second_coords: list[tuple[float, float]]) -> list[float]:
     """
-    :param first_coords: the coordinates of the first location on Earth's surface
-    :param second_coords: the coordinates of the second location on Earth's surface
-    :return: the geodesic distance between the two locations (in meters)
+    Computes many distances at once, vectorized with NumPy when it is installed
+    :param first_coords: the (latitude, longitude) coordinates of the first locations
+    :param second_coords: the (latitude, longitude) coordinates of the second locations
+    :return: the haversine distance between every pair of locations (in meters)
     """
-    return distance(first_coords, second_coords).meters
+    if len(first_coords) == 0:
+        return []
+
+    if numpy is None:
+        return [EARTH_RADIUS / GREAT_CIRCLE_RADIUS *
+                great_circle_distance(Node(0, first[0], first[1]), Node(1, second[0], second[1]))
+                for first, second in zip(first_coords, second_coords)]
+
+    first = numpy.radians(numpy.asarray(first_coords, dtype=numpy.float64))
+    second = numpy.radians(numpy.asarray(second_coords, dtype=numpy.float64))
+    sin_latitude = numpy.sin((second[:, 0] - first[:, 0]) / 2)
+    sin_longitude = numpy.sin((second[:, 1] - first[:, 1]) / 2)
+
+    a = sin_latitude ** 2 + numpy.cos(first[:, 0]) * numpy.cos(second[:, 0]) * sin_longitude ** 2
+    return (2 * EARTH_RADIUS * numpy.arcsin(numpy.minimum(1.0, numpy.sqrt(a)))).tolist()
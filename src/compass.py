@@ -1,5 +1,12 @@
-from src.gui import main_window
+import sys
 
 if __name__ == '__main__':
+    # Any command line argument selects the headless mode, which never imports the GUI
+    if len(sys.argv) > 1:
+        from src.cli import query_runner
+        sys.exit(query_runner.main(sys.argv[1:]))
+
+    from src.gui import main_window
+
     app = main_window.MainWindow()
     app.mainloop()
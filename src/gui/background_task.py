@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from src.algorithm.main_algorithm import Engine
+
+# how often the Tk event loop checks on a running task, in milliseconds
+POLL_INTERVAL_MS = 50
+
+# a running search checks for cancellation and reports its progress every this many expanded nodes
+PROGRESS_INTERVAL = 1000
+
+# kinds of messages sent from the worker thread to the Tk main thread
+PROGRESS = 'progress'
+DONE = 'done'
+ERROR = 'error'
+CANCELLED = 'cancelled'
+
+
+class TaskCancelled(Exception):
+    """
+    Raised inside a task which has been asked to stop
+    """
+
+
+class BackgroundTask:
+    """
+    Runs a function on a worker thread so the Tk event loop never blocks.
+    The function receives the task, through which it reports its progress and learns that it was cancelled.
+    Tk widgets must only be touched by the thread running the event loop, so the result, an error or the
+    progress is handed to the callbacks there, the task is polled with after() until the function returns.
+    """
+
+    # Engine keeps its expansion hook and the statistics of the last search in class attributes,
+    # so searches of different tasks run one at a time
+    __engine_lock = threading.Lock()
+
+    def __init__(self, widget, function: Callable[[BackgroundTask], Any],
+                 on_done: Callable[[Any], None],
+                 on_error: Callable[[Exception], None] = None,
+                 on_progress: Callable[[str], None] = None,
+                 on_cancel: Callable[[], None] = None):
+        """
+        :param widget: the widget whose after() polls the task
+        :param function: the work, called on the worker thread with the task
+        :param on_done: called with the result of the function
+        :param on_error: called with the exception raised by the function, it is raised again if omitted
+        :param on_progress: called with every progress message
+        :param on_cancel: called instead of on_done or on_error once a cancelled task has stopped
+        """
+        self.widget = widget
+        self.function = function
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+
+        self.__messages: queue.Queue = queue.Queue()
+        self.__cancel_event = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.__cancel_event.is_set()
+
+    def start(self) -> BackgroundTask:
+        """
+        Starts the worker thread and the polling, must be called on the Tk main thread
+        :return: the task
+        """
+        self.__thread.start()
+        self.widget.after(POLL_INTERVAL_MS, self.__poll)
+        return self
+
+    def cancel(self) -> None:
+        """
+        Asks the task to stop, a search stops at its next progress check, other work runs to its end
+        and its result is discarded
+        """
+        self.__cancel_event.set()
+
+    def check_cancelled(self) -> None:
+        """
+        Called by the function on the worker thread
+        :raises TaskCancelled: if the task has been cancelled
+        """
+        if self.__cancel_event.is_set():
+            raise TaskCancelled()
+
+    def report_progress(self, message: str) -> None:
+        """
+        Called by the function on the worker thread, the message is handed to on_progress
+        :param message: a short description of what the task is doing
+        """
+        self.__messages.put((PROGRESS, message))
+
+    @contextmanager
+    def searching(self) -> Iterator[None]:
+        """
+        Installs an Engine.on_expand hook for the searches run inside the context, which reports
+        the number of expanded nodes and stops the search once the task has been cancelled.
+        Engine.stats describes the last search until the context is left.
+        """
+        expanded = 0
+
+        def on_expand(node_index: int) -> None:
+            nonlocal expanded
+            expanded += 1
+            if expanded % PROGRESS_INTERVAL == 0:
+                self.check_cancelled()
+                self.report_progress(f'Searching... {expanded} nodes expanded')
+
+        with BackgroundTask.__engine_lock:
+            previous_hook = Engine.on_expand
+            Engine.on_expand = on_expand
+            try:
+                yield
+            finally:
+                Engine.on_expand = previous_hook
+
+    def __run(self) -> None:
+        try:
+            result = self.function(self)
+        except TaskCancelled:
+            self.__messages.put((CANCELLED, None))
+        except Exception as exception:
+            self.__messages.put((CANCELLED, None) if self.cancelled else (ERROR, exception))
+        else:
+            self.__messages.put((CANCELLED, None) if self.cancelled else (DONE, result))
+
+    def __poll(self) -> None:
+        # Every message sent since the last poll is handled, the task ends with its last message
+        while True:
+            try:
+                kind, value = self.__messages.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == PROGRESS:
+                if self.on_progress is not None:
+                    self.on_progress(value)
+                continue
+
+            if kind == DONE:
+                self.on_done(value)
+            elif kind == CANCELLED:
+                if self.on_cancel is not None:
+                    self.on_cancel()
+            elif self.on_error is not None:
+                self.on_error(value)
+            else:
+                raise value
+            return
+
+        self.widget.after(POLL_INTERVAL_MS, self.__poll)
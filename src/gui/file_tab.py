@@ -1,11 +1,25 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
 import customtkinter
-import matplotlib.pyplot as plt
-import networkx as nx
+import numpy
+from matplotlib.axes import Axes
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.figure import Figure
+from matplotlib.text import Text
 
+from src.algorithm.landmarks import LandmarkHeuristic, LandmarkTable
 from src.algorithm.main_algorithm import Engine
+from src.algorithm.search_stats import BUILD, LOAD, SearchStats
 from src.gui import util
+from src.gui.background_task import BackgroundTask
+from src.gui.graph_layout import LAYOUTS, GraphLayout
+from src.gui.level_of_detail import MAX_LABELLED_NODES, LevelOfDetail
+from src.io.binary_file_handler import BINARY_FILE_EXTENSION
 from src.io.file_handler import FileInputHandler
+from src.model.graph import Graph
 from src.model.node import Node
 
 
@@ -14,15 +28,28 @@ class FileTab(customtkinter.CTkFrame):
     starting_index: int = 0
     destination_index: int = 0
     nodes: list[Node] = []  # List of available Nodes
-    adj_matrix: list[list[float]] = [[]]  # Two-dimensional list to hold the adjacency matrix
+    graph: Graph = Graph()  # Sparse graph holding the weighted edges
+    landmarks: LandmarkTable = None  # Landmark tables of the graph, selected by the first ALT search
 
     # Output
     route: list[Node] = []  # List of route Nodes
     distance: float = 0
+    stats: SearchStats = SearchStats()  # Counters and phase times of the last search
+    load_stats: SearchStats = SearchStats()  # Time spent loading the file
+    task: BackgroundTask = None  # The load or search running on a worker thread
 
     # Attribute to save node positions in the graph visualization
-    input_graph: nx.Graph = None
-    node_positions: dict = {}
+    file_path: str = ''  # Path to the open file, computed layouts are cached by the hash of the file
+    node_positions: numpy.ndarray = None  # Position of every node index, one row per node
+    edge_segments: numpy.ndarray = None  # Start and end position of every edge, shape (edges, 2, 2)
+
+    # The figure of the input graph is drawn once per file, zooming and panning only change what is drawn
+    figure: Figure = None
+    edge_collection: LineCollection = None  # The edges drawn at the level of detail of the view
+    node_collection: PathCollection = None  # The nodes drawn at the level of detail of the view
+    node_labels: list[Text] = []  # Labels of the visible nodes, only drawn when few nodes are visible
+    route_collection: LineCollection = None  # The route, always drawn at full detail above the edges
+    level_of_detail_pending: bool = False  # Whether the level of detail is updated once Tk is idle
 
     def __init__(self, master, **kwargs):
         super().__init__(master, **kwargs)
@@ -48,7 +75,10 @@ class FileTab(customtkinter.CTkFrame):
                                                     text='Start',
                                                     font=button_font,
                                                     command=self.find_shortest_route_and_visualize_route)
-        self.start_button.grid(row=9, column=0, padx=20, pady=(10, 0))
+        self.start_button.grid(row=11, column=0, padx=20, pady=(10, 0))
+
+        # Changing the layout lays the open file out again
+        self.file_input_frame.layout_options.configure(command=self.change_layout)
 
         self.file_output_frame = FileOutputFrame(master=self)
         self.file_output_frame.grid(row=0, column=1, padx=(5, 10), pady=10, sticky='nswe')
@@ -58,80 +88,189 @@ class FileTab(customtkinter.CTkFrame):
         self.file_input_frame.file_validation_message.configure(text='')
         self.file_input_frame.status_message.configure(text='')
 
-        try:
-            FileTab.parse_file()
-        except FileNotFoundError:
+        # The dialog is shown on the main thread, the file is loaded and laid out on a worker thread
+        file_path = customtkinter.filedialog.askopenfilename(title='Open a Text File',
+                                                             filetypes=[("Text Files", "*.txt"),
+                                                                        ("Compass Graph Files",
+                                                                         f"*{BINARY_FILE_EXTENSION}")])
+        layout = self.file_input_frame.layout_options.get()
+        self.start_task(lambda task: FileTab.parse_file(file_path, layout, task),
+                        on_done=lambda result: self.show_input_graph(file_path, result),
+                        on_error=self.show_file_error,
+                        message_label=self.file_input_frame.file_validation_message)
+
+    @staticmethod
+    def parse_file(file_path: str, layout: str, task: BackgroundTask) -> (list[Node], Graph, SearchStats,
+                                                                           numpy.ndarray, numpy.ndarray):
+        """
+        Loads a graph file and lays the graph out, runs on a worker thread
+        :param file_path: path to the graph file
+        :param layout: one of the layout options
+        :param task: the task running the load
+        :return: the nodes, the graph, the load time, and the node positions and edge segments
+        if the graph has enough nodes to be shown
+        """
+        task.report_progress('Loading file...')
+        load_stats = SearchStats()
+        with load_stats.phase(LOAD):
+            nodes, graph = FileInputHandler.load_file(file_path)
+
+        if len(nodes) < 8:
+            return nodes, graph, load_stats, None, None
+
+        task.check_cancelled()
+        node_positions, edge_segments = FileTab.layout_input_graph(file_path, nodes, graph, layout, task)
+        return nodes, graph, load_stats, node_positions, edge_segments
+
+    def show_file_error(self, error: Exception) -> None:
+        if isinstance(error, FileNotFoundError):
             self.file_input_frame.file_validation_message.configure(text='Please open a file.',
                                                                     text_color='red')
-            return
-        except RuntimeError:
+        elif isinstance(error, RuntimeError):
             self.file_input_frame.file_validation_message.configure(text='Invalid file.',
                                                                     text_color='red')
-            return
+        else:
+            raise error
 
-        if len(FileTab.nodes) < 8:
+    def show_input_graph(self, file_path: str, result: (list[Node], Graph, SearchStats,
+                                                        numpy.ndarray, numpy.ndarray)) -> None:
+        nodes, graph, load_stats, node_positions, edge_segments = result
+        if len(nodes) < 8:
             self.file_input_frame.file_validation_message.configure(text='Minimum 8 nodes required.',
                                                                     text_color='red')
             return
 
-        self.visualize_input_graph()
+        FileTab.file_path = file_path
+        FileTab.nodes = nodes
+        FileTab.graph = graph
+        FileTab.landmarks = None
+        FileTab.load_stats = load_stats
+        FileTab.node_positions = node_positions
+        FileTab.edge_segments = edge_segments
+
+        # The route of the previous file does not belong to the new graph
+        FileTab.route = []
+        FileTab.distance = 0
+        FileTab.stats = SearchStats()
+        self.file_output_frame.result_tab_view.route_label.configure(text='')
+        self.file_output_frame.result_tab_view.distance_label.configure(text='')
+        self.file_output_frame.result_tab_view.stats_label.configure(text='')
 
-    @staticmethod
-    def parse_file() -> None:
-        file_path = customtkinter.filedialog.askopenfilename(title='Open a Text File',
-                                                             filetypes=[("Text Files", "*.txt")])
-        nodes, adj_matrix = FileInputHandler.load_file(file_path)
+        self.visualize_input_graph()
 
-        FileTab.nodes = nodes
-        FileTab.adj_matrix = adj_matrix
+    def start_task(self, function: Callable[[BackgroundTask], Any], on_done: Callable[[Any], None],
+                   on_error: Callable[[Exception], None], message_label: customtkinter.CTkLabel) -> None:
+        """
+        Runs a load or a search on a worker thread, the Start button cancels it until it has finished
+        :param function: the work, called with the task
+        :param on_done: called with the result on the main thread
+        :param on_error: called with the exception raised by the function on the main thread
+        :param message_label: where the progress is shown
+        """
+        def finish(callback: Callable, *args) -> None:
+            FileTab.task = None
+            self.start_button.configure(text='Start')
+            self.open_file_button.configure(state='normal')
+            callback(*args)
+
+        FileTab.task = BackgroundTask(self, function,
+                                      on_done=lambda result: finish(on_done, result),
+                                      on_error=lambda error: finish(on_error, error),
+                                      on_progress=lambda message: message_label.configure(text=message,
+                                                                                          text_color='gray50'),
+                                      on_cancel=lambda: finish(lambda: message_label.configure(text='Cancelled.',
+                                                                                               text_color='red')))
+        self.start_button.configure(text='Cancel')
+        self.open_file_button.configure(state='disabled')
+        FileTab.task.start()
+
+    def change_layout(self, layout: str) -> None:
+        # The new layout is used for the next file if none is shown or a file is being loaded
+        if FileTab.node_positions is None or FileTab.task is not None:
+            return
 
-    def visualize_input_graph(self) -> None:
-        num_nodes = len(FileTab.adj_matrix)
+        self.file_input_frame.file_validation_message.configure(text='')
+        self.start_task(lambda task: FileTab.layout_input_graph(FileTab.file_path, FileTab.nodes, FileTab.graph,
+                                                                layout, task),
+                        on_done=self.show_layout,
+                        on_error=self.show_file_error,
+                        message_label=self.file_input_frame.file_validation_message)
+
+    def show_layout(self, result: (numpy.ndarray, numpy.ndarray)) -> None:
+        FileTab.node_positions, FileTab.edge_segments = result
+        self.visualize_input_graph()
 
-        # Create an empty graph
-        FileTab.input_graph = nx.DiGraph()
+        # The route stays highlighted in the new layout, as long as it is a route of the laid out graph
+        if len(FileTab.route) > 0 and all(0 <= node.node_id < len(FileTab.node_positions) for node in FileTab.route):
+            self.visualize_route()
 
-        # Add nodes to the graph
-        FileTab.input_graph.add_nodes_from([node.node_id for node in FileTab.nodes])
+    @staticmethod
+    def layout_input_graph(file_path: str, nodes: list[Node], graph: Graph, layout: str,
+                           task: BackgroundTask) -> (numpy.ndarray, numpy.ndarray):
+        """
+        Lays the graph out, runs on a worker thread
+        :param file_path: path to the graph file, computed layouts are cached by its hash
+        :param nodes: the nodes of the graph
+        :param graph: the graph
+        :param layout: one of the layout options
+        :param task: the task computing the layout, a cancelled task stops a force-directed layout
+        :return: the position of every node and the start and end position of every edge
+        """
+        def report_iteration(iteration: int) -> None:
+            task.check_cancelled()
+            task.report_progress(f'Computing layout... {iteration} iterations')
 
-        # Add edges to the graph based on the adjacency matrix
-        for i in range(num_nodes):
-            for j in range(num_nodes):
-                weight = FileTab.adj_matrix[i][j]
-                if weight > 0:
-                    FileTab.input_graph.add_edge(i, j, weight=weight)  # Add edge with weight as an attribute
+        # Compute the node positions, the file coordinates are used as they are
+        task.report_progress('Computing layout...')
+        node_positions = GraphLayout.positions(layout, file_path, nodes, graph, progress=report_iteration)
 
-        # Compute the spring layout for node positions
-        FileTab.node_positions = nx.spring_layout(FileTab.input_graph)
+        # Edges are drawn without arrows, an edge stored in both directions is drawn once
+        sources, targets = GraphLayout.undirected_edges(graph)
+        edge_segments = numpy.stack((node_positions[sources], node_positions[targets]), axis=1)
+        return node_positions, edge_segments
 
-        # Create a Figure object
-        fig = plt.figure(figsize=(7, 4))  # Width and height in
+    def visualize_input_graph(self) -> None:
+        # Create a Figure object, it is not managed by pyplot, so it is freed with its canvas
+        FileTab.figure = Figure(figsize=(7, 4))  # Width and height in inches
 
         # Configure subplot params
-        plt.subplots_adjust(left=0, bottom=0, right=1, top=1)
+        FileTab.figure.subplots_adjust(left=0, bottom=0, right=1, top=1)
 
-        # Remove black borders
-        ax = fig.gca()
+        # Remove black borders and ticks
+        ax = FileTab.figure.gca()
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
         ax.spines['bottom'].set_visible(False)
         ax.spines['left'].set_visible(False)
-
-        # Draw nodes
-        nx.draw_networkx_nodes(FileTab.input_graph, pos=FileTab.node_positions)
-
-        # Draw edges
-        nx.draw_networkx_edges(FileTab.input_graph, pos=FileTab.node_positions)
-
-        # Draw node labels
-        nx.draw_networkx_labels(FileTab.input_graph, pos=FileTab.node_positions)
+        ax.tick_params(axis='both', which='both', bottom=False, left=False, labelbottom=False, labelleft=False)
+
+        # One artist for all edges, one for all nodes and one for the route, the view decides what they hold
+        FileTab.edge_collection = LineCollection([], colors='black', linewidths=1.0, zorder=1)
+        FileTab.route_collection = LineCollection([], colors='yellow', linewidths=2.0, zorder=2)
+        FileTab.node_collection = ax.scatter([], [], c='#1f78b4', zorder=3)
+        ax.add_collection(FileTab.edge_collection)
+        ax.add_collection(FileTab.route_collection)
+        FileTab.node_labels = []
+        FileTab.level_of_detail_pending = False
+
+        # The view shows the whole graph with a small margin
+        low, high = FileTab.node_positions.min(axis=0), FileTab.node_positions.max(axis=0)
+        margin = numpy.maximum((high - low) * 0.05, 1e-9)
+        ax.set_xlim(low[0] - margin[0], high[0] + margin[0])
+        ax.set_ylim(low[1] - margin[1], high[1] + margin[1])
+        FileTab.update_level_of_detail(ax)
+
+        # Zooming and panning with the navigation toolbar changes the limits
+        ax.callbacks.connect('xlim_changed', FileTab.schedule_level_of_detail)
+        ax.callbacks.connect('ylim_changed', FileTab.schedule_level_of_detail)
 
         # Destroy graph canvas and navigation toolbar if present
         self.file_output_frame.graph_canvas.get_tk_widget().destroy()
         self.file_output_frame.graph_navigation_toolbar.destroy()
 
         # Visualize the graph
-        self.file_output_frame.graph_canvas = FigureCanvasTkAgg(fig, master=self.file_output_frame.graph_frame)
+        self.file_output_frame.graph_canvas = FigureCanvasTkAgg(FileTab.figure,
+                                                                master=self.file_output_frame.graph_frame)
         self.file_output_frame.graph_canvas.draw()
         self.file_output_frame.graph_canvas.get_tk_widget().pack()
 
@@ -142,7 +281,57 @@ class FileTab(customtkinter.CTkFrame):
 
         self.file_input_frame.file_validation_message.configure(text='Graph visualized.', text_color='green')
 
+    @staticmethod
+    def schedule_level_of_detail(ax: Axes) -> None:
+        """
+        Updates the level of detail once Tk is idle, so a zoom changing both limits updates it once
+        and before the canvas is redrawn
+        :param ax: the axes showing the input graph
+        """
+        if FileTab.level_of_detail_pending:
+            return
+
+        def update() -> None:
+            FileTab.level_of_detail_pending = False
+            FileTab.update_level_of_detail(ax)
+            ax.figure.canvas.draw_idle()
+
+        FileTab.level_of_detail_pending = True
+        ax.figure.canvas.get_tk_widget().after_idle(update)
+
+    @staticmethod
+    def update_level_of_detail(ax: Axes) -> None:
+        """
+        Draws the edges and nodes in the view of the axes, decimated when there are too many of them,
+        labels are only drawn when few nodes are visible
+        :param ax: the axes showing the input graph
+        """
+        xlim, ylim = ax.get_xlim(), ax.get_ylim()
+        FileTab.edge_collection.set_segments(
+            FileTab.edge_segments[LevelOfDetail.edges_to_draw(FileTab.edge_segments, xlim, ylim)])
+
+        node_indices = LevelOfDetail.nodes_to_draw(FileTab.node_positions, xlim, ylim)
+        FileTab.node_collection.set_offsets(FileTab.node_positions[node_indices])
+
+        # Big labelled nodes like networkx draws them when they can be told apart, small dots otherwise
+        for label in FileTab.node_labels:
+            label.remove()
+        FileTab.node_labels = []
+        if len(node_indices) <= MAX_LABELLED_NODES:
+            FileTab.node_collection.set_sizes([300])
+            for node_index in node_indices.tolist():
+                x, y = FileTab.node_positions[node_index]
+                FileTab.node_labels.append(ax.text(x, y, str(node_index), ha='center', va='center', zorder=4,
+                                                   clip_on=True))
+        else:
+            FileTab.node_collection.set_sizes([4])
+
     def find_shortest_route_and_visualize_route(self) -> None:
+        # While a file is loaded or a route is searched, the Start button cancels it
+        if FileTab.task is not None:
+            FileTab.task.cancel()
+            return
+
         # If the user hasn't opened a file
         if len(FileTab.nodes) == 0:
             # Clear status message
@@ -175,86 +364,98 @@ class FileTab(customtkinter.CTkFrame):
             else:
                 self.file_input_frame.status_message.configure(text="")
 
-        try:
-            self.find_shortest_route()
-        except TypeError:
+        # The widgets are read on the main thread, the route is searched on a worker thread
+        FileTab.starting_index = int(self.file_input_frame.starting_node_entry.get())
+        FileTab.destination_index = int(self.file_input_frame.destination_node_entry.get())
+        algorithm = self.file_input_frame.algorithm_options.get()
+        self.start_task(lambda task: FileTab.find_shortest_route(algorithm, task),
+                        on_done=self.show_search_result,
+                        on_error=self.show_search_error,
+                        message_label=self.file_input_frame.status_message)
+
+    def show_search_result(self, result: (float, list[Node], SearchStats) | None) -> None:
+        if result is None:
             # There is no route from the starting node to the destination node
             self.file_input_frame.status_message.configure(text="No route found.",
                                                            text_color='red')
             return
 
+        FileTab.distance, FileTab.route, FileTab.stats = result
         self.visualize_route()
         self.show_route_and_distance()
 
-    def find_shortest_route(self) -> None:
-        FileTab.starting_index = int(self.file_input_frame.starting_node_entry.get())
-        FileTab.destination_index = int(self.file_input_frame.destination_node_entry.get())
-
-        # Start algorithm
-        if self.file_input_frame.algorithm_options.get() == 'A*':
-            # A-star path-finding
-            FileTab.distance, FileTab.route = Engine.search_astar(FileTab.starting_index,
-                                                                  FileTab.destination_index,
-                                                                  FileTab.nodes,
-                                                                  FileTab.adj_matrix)
-        else:
-            # UCS path-finding
-            FileTab.distance, FileTab.route = Engine.search_ucs(FileTab.starting_index,
-                                                                FileTab.destination_index,
-                                                                FileTab.nodes,
-                                                                FileTab.adj_matrix)
+    def show_search_error(self, error: Exception) -> None:
+        # A search only fails because of a bug, it is reported like any other error in a Tk callback
+        raise error
 
-    def visualize_route(self) -> None:
-        # Create a Figure object
-        fig = plt.figure(figsize=(7, 4))
-
-        # Configure subplot params
-        plt.subplots_adjust(left=0, bottom=0, right=1, top=1)
-
-        # List of node IDs to color edges between
-        route_nodes = [node.node_id for node in FileTab.route]
-
-        # Iterate over edges to get the edges that needs to be colored yellow
-        route_edges = []
-        i = 0
-        while i < len(route_nodes) - 1:
-            for edge in FileTab.input_graph.edges():
-                if i + 1 < len(route_nodes):
-                    if (edge[0] == route_nodes[i] and edge[1] == route_nodes[i + 1]) or \
-                            (edge[1] == route_nodes[i] and edge[0] == route_nodes[i + 1]):
-                        route_edges.append(edge)
-                        i += 1
-                else:
-                    break
-
-        # Color the route edges yellow
-        for edge in FileTab.input_graph.edges():
-            if edge in route_edges:
-                FileTab.input_graph.edges[edge]['edge_color'] = 'yellow'
-            else:
-                FileTab.input_graph.edges[edge]['edge_color'] = 'black'
+    @staticmethod
+    def find_shortest_route(algorithm: str, task: BackgroundTask) -> (float, list[Node], SearchStats) | None:
+        """
+        Searches the route between the starting node and the destination node, runs on a worker thread
+        :param algorithm: one of the algorithm options
+        :param task: the task running the search, a cancelled task stops the search
+        :return: the distance, the route and the search statistics, or None if there is no route
+        """
+        build_stats = SearchStats()
 
-        # Draw nodes
-        nx.draw_networkx_nodes(FileTab.input_graph, pos=FileTab.node_positions)
+        # Start algorithm
+        with task.searching():
+            result = FileTab.search(algorithm, build_stats)
+            if result is None:
+                return None
 
-        # Draw edges
-        nx.draw_networkx_edges(FileTab.input_graph, pos=FileTab.node_positions)
+            # Search statistics together with the time spent loading the file and building the landmarks
+            stats = Engine.stats
+            stats.phase_times.update(FileTab.load_stats.phase_times)
+            stats.phase_times.update(build_stats.phase_times)
 
-        # Draw node labels
-        nx.draw_networkx_labels(FileTab.input_graph, pos=FileTab.node_positions)
+        distance, route = result
+        return distance, route, stats
 
-        # Draw the graph with edge colors
-        edge_colors = [FileTab.input_graph.edges[edge]['edge_color'] for edge in FileTab.input_graph.edges()]
-        nx.draw(FileTab.input_graph, pos=FileTab.node_positions, with_labels=True, edge_color=edge_colors)
+    @staticmethod
+    def search(algorithm: str, build_stats: SearchStats) -> (float, list[Node]) | None:
+        """
+        :param algorithm: one of the algorithm options
+        :param build_stats: where the time spent selecting landmarks is added
+        :return: the distance and the route, or None if there is no route
+        """
+        if algorithm == 'A*':
+            # A-star path-finding
+            return Engine.search_astar(FileTab.starting_index,
+                                       FileTab.destination_index,
+                                       FileTab.nodes,
+                                       FileTab.graph)
+        elif algorithm == 'UCS':
+            # UCS path-finding, a starting node which is searched again is answered from its shortest path tree
+            return Engine.search_repeated_ucs(FileTab.starting_index,
+                                              FileTab.destination_index,
+                                              FileTab.nodes,
+                                              FileTab.graph)
+        elif algorithm == 'ALT':
+            # A-star with the landmark heuristic, which does not depend on the node coordinates
+            if FileTab.landmarks is None:
+                with build_stats.phase(BUILD):
+                    FileTab.landmarks = LandmarkTable.select(FileTab.graph)
+            return Engine.search_astar(FileTab.starting_index,
+                                       FileTab.destination_index,
+                                       FileTab.nodes,
+                                       FileTab.graph,
+                                       LandmarkHeuristic(FileTab.landmarks))
+        else:
+            # Bidirectional Dijkstra, the Euclidean heuristic is not guaranteed to be consistent
+            return Engine.search_bidirectional(FileTab.starting_index,
+                                               FileTab.destination_index,
+                                               FileTab.nodes,
+                                               FileTab.graph)
 
-        # Destroy graph canvas (if a plot is present this destroys it)
-        self.file_output_frame.graph_canvas.get_tk_widget().destroy()
+    def visualize_route(self) -> None:
+        # The route is drawn on top of the edges at full detail, whatever the level of detail of the view
+        route_indices = [node.node_id for node in FileTab.route]
+        route_positions = FileTab.node_positions[route_indices]
+        FileTab.route_collection.set_segments(numpy.stack((route_positions[:-1], route_positions[1:]), axis=1))
 
-        # Visualize the graph
-        self.file_output_frame.graph_canvas = FigureCanvasTkAgg(fig,
-                                                                master=self.file_output_frame.graph_frame)
-        self.file_output_frame.graph_canvas.draw()
-        self.file_output_frame.graph_canvas.get_tk_widget().pack()
+        # Only the route changed, the canvas is redrawn when Tk is idle
+        self.file_output_frame.graph_canvas.draw_idle()
 
         self.file_input_frame.status_message.configure(text='Route visualized.',
                                                        text_color='green')
@@ -268,6 +469,7 @@ class FileTab(customtkinter.CTkFrame):
 
         self.file_output_frame.result_tab_view.route_label.configure(text=route)
         self.file_output_frame.result_tab_view.distance_label.configure(text=f'{FileTab.distance:.5f} m')
+        self.file_output_frame.result_tab_view.stats_label.configure(text=str(FileTab.stats))
 
     @staticmethod
     def is_index_valid(index: int) -> bool:
@@ -277,7 +479,7 @@ class FileTab(customtkinter.CTkFrame):
         :return: True if the index is valid, False otherwise
         """
         try:
-            if 0 <= int(index) <= len(FileTab.adj_matrix) - 1:
+            if 0 <= int(index) <= len(FileTab.graph) - 1:
                 return True
         except ValueError:
             return False
@@ -296,9 +498,10 @@ class FileInputFrame(customtkinter.CTkFrame):
         entry_font = customtkinter.CTkFont(family='Segoe UI', size=-13, weight='normal')
         select_theme_font = customtkinter.CTkFont(family='Segoe UI', size=-13, weight='normal')
         select_algorithm_font = customtkinter.CTkFont(family='Segoe UI', size=-13, weight='normal')
+        select_layout_font = customtkinter.CTkFont(family='Segoe UI', size=-13, weight='normal')
 
         # Expandable empty space between the Start button and UI theme options
-        self.grid_rowconfigure(11, weight=1)
+        self.grid_rowconfigure(13, weight=1)
 
         # App title
         self.app_title = customtkinter.CTkLabel(master=self,
@@ -313,56 +516,67 @@ class FileInputFrame(customtkinter.CTkFrame):
                                                               font=message_font)
         self.file_validation_message.grid(row=2, column=0, padx=20, pady=0)
 
+        # Select layout, used for the next file and applied to the open file when changed
+        self.select_layout_label = customtkinter.CTkLabel(master=self,
+                                                          text="Select layout:",
+                                                          font=input_label_font)
+        self.select_layout_label.grid(row=3, column=0, padx=20, pady=(5, 0))
+
+        self.layout_options = customtkinter.CTkOptionMenu(master=self,
+                                                          values=list(LAYOUTS),
+                                                          font=select_layout_font)
+        self.layout_options.grid(row=4, column=0, padx=20, pady=(0, 10))
+
         # Starting node and destination node
         self.starting_node_label = customtkinter.CTkLabel(master=self,
                                                           text='Starting node:',
                                                           font=input_label_font)
-        self.starting_node_label.grid(row=3, column=0, padx=20, pady=0)
+        self.starting_node_label.grid(row=5, column=0, padx=20, pady=0)
 
         self.starting_node_entry = customtkinter.CTkEntry(master=self,
                                                           placeholder_text="Node number",
                                                           font=entry_font)
-        self.starting_node_entry.grid(row=4, column=0, padx=20, pady=0)
+        self.starting_node_entry.grid(row=6, column=0, padx=20, pady=0)
 
         self.destination_node_label = customtkinter.CTkLabel(master=self,
                                                              text='Destination node:',
                                                              font=input_label_font)
-        self.destination_node_label.grid(row=5, column=0, padx=20, pady=0)
+        self.destination_node_label.grid(row=7, column=0, padx=20, pady=0)
 
         self.destination_node_entry = customtkinter.CTkEntry(master=self,
                                                              placeholder_text="Node number",
                                                              font=entry_font)
-        self.destination_node_entry.grid(row=6, column=0, padx=20, pady=(0, 5))
+        self.destination_node_entry.grid(row=8, column=0, padx=20, pady=(0, 5))
 
         # Select algorithm
         self.select_algorithm_label = customtkinter.CTkLabel(master=self,
                                                              text="Select algorithm:",
                                                              font=input_label_font)
-        self.select_algorithm_label.grid(row=7, column=0, padx=20, pady=(5, 0))
+        self.select_algorithm_label.grid(row=9, column=0, padx=20, pady=(5, 0))
 
         self.algorithm_options = customtkinter.CTkOptionMenu(master=self,
-                                                             values=['A*', 'UCS'],
+                                                             values=['A*', 'UCS', 'Bidirectional', 'ALT'],
                                                              font=select_algorithm_font)
-        self.algorithm_options.grid(row=8, column=0, padx=20, pady=(0, 10))
+        self.algorithm_options.grid(row=10, column=0, padx=20, pady=(0, 10))
 
         # Start button is defined in FileTab
 
         self.status_message = customtkinter.CTkLabel(master=self,
                                                      text='',
                                                      font=message_font)
-        self.status_message.grid(row=10, column=0, padx=20, pady=0)
+        self.status_message.grid(row=12, column=0, padx=20, pady=0)
 
         # Select GUI theme
         self.select_theme_label = customtkinter.CTkLabel(master=self,
                                                          text="Select theme:",
                                                          font=select_theme_font)
-        self.select_theme_label.grid(row=12, column=0, padx=20, pady=0)
+        self.select_theme_label.grid(row=14, column=0, padx=20, pady=0)
 
         self.theme_options = customtkinter.CTkOptionMenu(master=self,
                                                          values=["Dark", "Light", "System"],
                                                          font=select_theme_font,
                                                          command=util.change_appearance_mode)
-        self.theme_options.grid(row=13, column=0, padx=20, pady=(0, 20))
+        self.theme_options.grid(row=15, column=0, padx=20, pady=(0, 20))
 
 
 class FileOutputFrame(customtkinter.CTkFrame):
@@ -405,12 +619,14 @@ class FileResultTabView(customtkinter.CTkTabview):
 
         output_font = customtkinter.CTkFont(family='Segoe UI', size=-14, weight='normal')
 
-        # Create two tabs for output
+        # Create three tabs for output
         self.add('Route')
         self.add('Distance')
+        self.add('Stats')
 
         self.tab('Route').grid_columnconfigure(0, weight=1)
         self.tab('Distance').grid_columnconfigure(0, weight=1)
+        self.tab('Stats').grid_columnconfigure(0, weight=1)
 
         # Create a scrollable frame to hold the route
         self.route_scrollable_frame = customtkinter.CTkScrollableFrame(master=self.tab('Route'),
@@ -430,3 +646,11 @@ class FileResultTabView(customtkinter.CTkTabview):
                                                      text_color='green',
                                                      font=output_font)
         self.distance_label.grid(row=0, column=0, pady=(20, 0))
+
+        # Create a label for search statistics
+        self.stats_label = customtkinter.CTkLabel(master=self.tab('Stats'),
+                                                  text='',
+                                                  text_color='green',
+                                                  justify='left',
+                                                  font=output_font)
+        self.stats_label.grid(row=0, column=0, pady=(10, 0))
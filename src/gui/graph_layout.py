@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+from typing import Callable, Sequence
+
+import networkx as nx
+import numpy
+
+from src.model.graph import Graph
+from src.model.node import Node
+from src.model.node_table import NodeTable
+
+# layout strategies, as shown in the layout options
+FILE_COORDINATES = 'File coordinates'
+SPRING = 'Spring'
+FORCE_DIRECTED = 'Force-directed'
+LAYOUTS = (FILE_COORDINATES, SPRING, FORCE_DIRECTED)
+
+# names of the computed layouts in the cache file names
+CACHE_NAMES = {SPRING: 'spring', FORCE_DIRECTED: 'force-directed'}
+
+# computed layouts are kept here, keyed by the hash of the graph file
+LAYOUT_CACHE_DIRECTORY = os.path.join(os.path.expanduser('~'), '.cache', 'compass', 'layouts')
+
+# the force-directed layout coarsens the graph down to about this many nodes
+COARSEST_NODES = 50
+
+# coarsening stops once a level has more than this fraction of the nodes of the finer level
+COARSENING_RATIO = 0.8
+
+# iterations of the force-directed layout on the coarsest graph and on every finer graph
+COARSEST_ITERATIONS = 100
+REFINEMENT_ITERATIONS = 15
+
+
+class GraphLayout:
+    """
+    Node positions for drawing a graph, as an array holding the x and y coordinate of every node index.
+    The file coordinates cost nothing, the computed layouts are for graphs without meaningful coordinates
+    and are cached on disk by the hash of the graph file.
+    """
+
+    @staticmethod
+    def file_hash(file_path: str) -> str:
+        """
+        :param file_path: path to the graph file
+        :return: the SHA-256 hash of the file contents
+        """
+        file_hash = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    @staticmethod
+    def file_coordinates(nodes: Sequence[Node]) -> numpy.ndarray:
+        """
+        :param nodes: the nodes
+        :return: the coordinates the nodes carry
+        """
+        if isinstance(nodes, NodeTable):
+            return numpy.column_stack((numpy.frombuffer(nodes.x, dtype=numpy.float64),
+                                       numpy.frombuffer(nodes.y, dtype=numpy.float64)))
+        return numpy.array([(node.x, node.y) for node in nodes], dtype=numpy.float64).reshape(-1, 2)
+
+    @staticmethod
+    def undirected_edges(graph: Graph) -> (numpy.ndarray, numpy.ndarray):
+        """
+        :param graph: the graph
+        :return: the smaller and the larger node index of every pair of neighbours, each pair once
+        """
+        sources = numpy.repeat(numpy.arange(len(graph)), numpy.diff(numpy.asarray(graph.offsets)))
+        targets = numpy.asarray(graph.neighbours, dtype=numpy.int64)
+        first, second = numpy.minimum(sources, targets), numpy.maximum(sources, targets)
+        pairs = numpy.unique(numpy.column_stack((first, second))[first != second], axis=0)
+        return pairs[:, 0], pairs[:, 1]
+
+    @staticmethod
+    def __coarsen(node_count: int, sources: numpy.ndarray, targets: numpy.ndarray,
+                  generator: numpy.random.Generator) -> (numpy.ndarray, int):
+        # a random maximal matching, both ends of a matched edge become one node of the coarser graph
+        parents = [-1] * node_count
+        coarse_count = 0
+        for edge in generator.permutation(len(sources)).tolist():
+            u, v = int(sources[edge]), int(targets[edge])
+            if parents[u] == -1 and parents[v] == -1:
+                parents[u] = parents[v] = coarse_count
+                coarse_count += 1
+
+        for i in range(node_count):
+            if parents[i] == -1:
+                parents[i] = coarse_count
+                coarse_count += 1
+        return numpy.array(parents, dtype=numpy.int64), coarse_count
+
+    @staticmethod
+    def __repulsion(positions: numpy.ndarray, k: float) -> numpy.ndarray:
+        # Nodes repel the nodes in their own grid cell exactly and every other cell as a single mass at its centroid.
+        # With about sqrt(N) cells both parts cost O(N^1.5) instead of O(N^2).
+        node_count = len(positions)
+        cells_per_side = max(1, round(node_count ** 0.25))
+        cell_count = cells_per_side * cells_per_side
+
+        low = positions.min(axis=0)
+        size = numpy.maximum(positions.max(axis=0) - low, 1e-9)
+        cells = numpy.minimum((positions - low) / size * cells_per_side, cells_per_side - 1).astype(numpy.int64)
+        cell_ids = cells[:, 0] * cells_per_side + cells[:, 1]
+
+        masses = numpy.bincount(cell_ids, minlength=cell_count).astype(numpy.float64)
+        occupied = numpy.flatnonzero(masses)
+        centroids = numpy.column_stack((numpy.bincount(cell_ids, weights=positions[:, 0], minlength=cell_count),
+                                        numpy.bincount(cell_ids, weights=positions[:, 1], minlength=cell_count)))
+        centroids = centroids[occupied] / masses[occupied, None]
+        masses = masses[occupied]
+        own_cells = numpy.searchsorted(occupied, cell_ids)
+
+        # the other cells, in chunks of nodes to bound the memory
+        force = numpy.zeros((node_count, 2))
+        chunk_size = max(1, (1 << 21) // len(occupied))
+        for start in range(0, node_count, chunk_size):
+            chunk = slice(start, start + chunk_size)
+            dx = positions[chunk, 0, None] - centroids[None, :, 0]
+            dy = positions[chunk, 1, None] - centroids[None, :, 1]
+            scale = masses * (k * k) / numpy.maximum(dx * dx + dy * dy, 1e-12)
+            scale[numpy.arange(len(scale)), own_cells[chunk]] = 0.0
+            force[chunk, 0] = (dx * scale).sum(axis=1)
+            force[chunk, 1] = (dy * scale).sum(axis=1)
+
+        # every ordered pair of nodes in the same cell, built from the nodes sorted by cell
+        order = numpy.argsort(cell_ids, kind='stable')
+        starts = numpy.searchsorted(cell_ids[order], cell_ids[order], side='left')
+        ends = numpy.searchsorted(cell_ids[order], cell_ids[order], side='right')
+        counts = ends - starts
+        first = numpy.repeat(numpy.arange(node_count), counts)
+        second = starts[first] + numpy.arange(len(first)) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+        first, second = order[first], order[second]
+        different = first != second
+        first, second = first[different], second[different]
+
+        dx = positions[first, 0] - positions[second, 0]
+        dy = positions[first, 1] - positions[second, 1]
+        scale = (k * k) / numpy.maximum(dx * dx + dy * dy, 1e-12)
+        force[:, 0] += numpy.bincount(first, weights=dx * scale, minlength=node_count)
+        force[:, 1] += numpy.bincount(first, weights=dy * scale, minlength=node_count)
+        return force
+
+    @staticmethod
+    def __refine(positions: numpy.ndarray, sources: numpy.ndarray, targets: numpy.ndarray, iterations: int,
+                 temperature: float, progress: Callable[[], None] = None) -> numpy.ndarray:
+        # Fruchterman-Reingold iterations, positions within the unit square
+        node_count = len(positions)
+        # ideal distance between neighbours, the nodes spread over the unit square
+        k = 1.0 / math.sqrt(node_count)
+        cooling = temperature / (iterations + 1)
+
+        for _ in range(iterations):
+            displacement = GraphLayout.__repulsion(positions, k)
+
+            # attraction d^2 / k along the edges
+            delta = positions[sources] - positions[targets]
+            pull = delta * (numpy.sqrt((delta ** 2).sum(axis=1)) / k)[:, None]
+            for axis in (0, 1):
+                displacement[:, axis] -= numpy.bincount(sources, weights=pull[:, axis], minlength=node_count)
+                displacement[:, axis] += numpy.bincount(targets, weights=pull[:, axis], minlength=node_count)
+
+            # every node moves at most the temperature, which cools down linearly
+            length = numpy.maximum(numpy.sqrt((displacement ** 2).sum(axis=1)), 1e-12)
+            positions += displacement * (numpy.minimum(length, temperature) / length)[:, None]
+            temperature -= cooling
+
+            if progress is not None:
+                progress()
+
+        # scaled to the unit square
+        positions -= positions.min(axis=0)
+        return positions / max(positions.max(), 1e-12)
+
+    @staticmethod
+    def force_directed(graph: Graph, seed: int = 0, progress: Callable[[int], None] = None) -> numpy.ndarray:
+        """
+        Multilevel force-directed layout in the style of sfdp: the graph is coarsened by merging matched neighbours,
+        the coarsest graph is laid out first and every finer graph starts from the positions of the coarser one.
+        Repulsion is approximated Barnes-Hut style on a grid, edges are weightless springs.
+        :param graph: the graph
+        :param seed: seed of the matchings and the starting positions
+        :param progress: called with the number of finished iterations, may raise to stop the layout
+        :return: the positions, within the unit square
+        """
+        generator = numpy.random.default_rng(seed)
+        node_count = len(graph)
+        if node_count < 2:
+            return generator.random((node_count, 2))
+
+        # the levels from the graph down to the coarsest graph
+        levels = [(node_count, *GraphLayout.undirected_edges(graph))]
+        parents_by_level = []
+        while levels[-1][0] > COARSEST_NODES:
+            level_count, sources, targets = levels[-1]
+            parents, coarse_count = GraphLayout.__coarsen(level_count, sources, targets, generator)
+            if coarse_count > COARSENING_RATIO * level_count:
+                break
+
+            first, second = numpy.minimum(parents[sources], parents[targets]), \
+                numpy.maximum(parents[sources], parents[targets])
+            pairs = numpy.unique(numpy.column_stack((first, second))[first != second], axis=0)
+            levels.append((coarse_count, pairs[:, 0], pairs[:, 1]))
+            parents_by_level.append(parents)
+
+        iterations = 0
+
+        def count_iteration() -> None:
+            nonlocal iterations
+            iterations += 1
+            if progress is not None:
+                progress(iterations)
+
+        level_count, sources, targets = levels[-1]
+        positions = GraphLayout.__refine(generator.random((level_count, 2)), sources, targets,
+                                         COARSEST_ITERATIONS, 0.1, count_iteration)
+
+        for (level_count, sources, targets), parents in zip(reversed(levels[:-1]), reversed(parents_by_level)):
+            # merged nodes start at the position of their coarse node, slightly apart
+            k = 1.0 / math.sqrt(level_count)
+            positions = positions[parents] + generator.uniform(-0.1 * k, 0.1 * k, (level_count, 2))
+            positions = GraphLayout.__refine(positions, sources, targets, REFINEMENT_ITERATIONS, 2 * k,
+                                             count_iteration)
+
+        return positions
+
+    @staticmethod
+    def spring(graph: Graph, seed: int = 0) -> numpy.ndarray:
+        """
+        :param graph: the graph
+        :param seed: seed of the random starting positions
+        :return: the networkx spring layout positions
+        """
+        input_graph = nx.Graph()
+        input_graph.add_nodes_from(range(len(graph)))
+        input_graph.add_edges_from((i, j) for i, j, weight in graph.edges() if weight > 0)
+        positions = nx.spring_layout(input_graph, seed=seed)
+        return numpy.array([positions[i] for i in range(len(graph))], dtype=numpy.float64).reshape(-1, 2)
+
+    @staticmethod
+    def positions(layout: str, file_path: str, nodes: Sequence[Node], graph: Graph,
+                  progress: Callable[[int], None] = None) -> numpy.ndarray:
+        """
+        :param layout: one of LAYOUTS
+        :param file_path: path to the graph file, computed layouts are cached by its hash
+        :param nodes: the nodes of the graph
+        :param graph: the graph
+        :param progress: called with the number of finished iterations of a force-directed layout
+        :return: the position of every node index
+        """
+        if layout == FILE_COORDINATES:
+            return GraphLayout.file_coordinates(nodes)
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout '{layout}'.")
+
+        cache_path = os.path.join(LAYOUT_CACHE_DIRECTORY,
+                                  f'{GraphLayout.file_hash(file_path)}-{CACHE_NAMES[layout]}.npy')
+        if os.path.exists(cache_path):
+            positions = numpy.load(cache_path)
+            if positions.shape == (len(graph), 2):
+                return positions
+
+        if layout == SPRING:
+            positions = GraphLayout.spring(graph)
+        else:
+            positions = GraphLayout.force_directed(graph, progress=progress)
+
+        # a layout which cannot be cached is computed again next time
+        try:
+            os.makedirs(LAYOUT_CACHE_DIRECTORY, exist_ok=True)
+            with open(cache_path + '.part', 'wb') as file:
+                numpy.save(file, positions)
+            os.replace(cache_path + '.part', cache_path)
+        except OSError:
+            pass
+        return positions
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import numpy
+
+# the view is divided into this many cells per side when edges or nodes are decimated, a few pixels each
+DECIMATION_RESOLUTION = 128
+
+# visible edges and nodes are drawn one by one up to these counts and decimated above
+MAX_DETAILED_EDGES = 5000
+MAX_DETAILED_NODES = 5000
+
+# node labels are only drawn when at most this many nodes are visible
+MAX_LABELLED_NODES = 100
+
+
+class LevelOfDetail:
+    """
+    Chooses what part of a large graph is drawn for the current view. Edges and nodes outside the view are culled,
+    and when too many remain, edges and nodes which would fall on the same few pixels are drawn once.
+    Views are given as the x limits and the y limits of the axes.
+    """
+
+    @staticmethod
+    def __cells(points: numpy.ndarray, xlim: (float, float), ylim: (float, float)) -> numpy.ndarray:
+        # the decimation grid cell of every point, points outside the view get cells outside the grid
+        low = numpy.array([min(xlim), min(ylim)])
+        size = numpy.maximum(numpy.array([abs(xlim[1] - xlim[0]), abs(ylim[1] - ylim[0])]), 1e-12)
+        return numpy.floor((points - low) / size * DECIMATION_RESOLUTION).astype(numpy.int64)
+
+    @staticmethod
+    def visible_edges(segments: numpy.ndarray, xlim: (float, float), ylim: (float, float)) -> numpy.ndarray:
+        """
+        :param segments: the start and end position of every edge, shape (edges, 2, 2)
+        :param xlim: the x limits of the view
+        :param ylim: the y limits of the view
+        :return: indices of the edges whose bounding box overlaps the view
+        """
+        start_x, start_y, end_x, end_y = segments[:, 0, 0], segments[:, 0, 1], segments[:, 1, 0], segments[:, 1, 1]
+        return numpy.flatnonzero((numpy.maximum(start_x, end_x) >= min(xlim)) &
+                                 (numpy.minimum(start_x, end_x) <= max(xlim)) &
+                                 (numpy.maximum(start_y, end_y) >= min(ylim)) &
+                                 (numpy.minimum(start_y, end_y) <= max(ylim)))
+
+    @staticmethod
+    def visible_nodes(positions: numpy.ndarray, xlim: (float, float), ylim: (float, float)) -> numpy.ndarray:
+        """
+        :param positions: the position of every node, shape (nodes, 2)
+        :param xlim: the x limits of the view
+        :param ylim: the y limits of the view
+        :return: indices of the nodes inside the view
+        """
+        return numpy.flatnonzero((positions[:, 0] >= min(xlim)) & (positions[:, 0] <= max(xlim)) &
+                                 (positions[:, 1] >= min(ylim)) & (positions[:, 1] <= max(ylim)))
+
+    @staticmethod
+    def decimate_edges(segments: numpy.ndarray, indices: numpy.ndarray, xlim: (float, float),
+                       ylim: (float, float)) -> numpy.ndarray:
+        """
+        Edges between the same two grid cells are drawn once and edges within one cell are left out,
+        edges reaching more than a view away from the view are always kept
+        :param segments: the start and end position of every edge, shape (edges, 2, 2)
+        :param indices: indices of the visible edges
+        :param xlim: the x limits of the view
+        :param ylim: the y limits of the view
+        :return: indices of the edges to draw
+        """
+        cells = LevelOfDetail.__cells(segments[indices], xlim, ylim)
+        near = ((cells >= -DECIMATION_RESOLUTION) & (cells < 2 * DECIMATION_RESOLUTION)).all(axis=(1, 2))
+
+        # cells of the extended grid, three views wide, are numbered row by row
+        width = 3 * DECIMATION_RESOLUTION
+        cell_ids = (cells[near, :, 0] + DECIMATION_RESOLUTION) * width + cells[near, :, 1] + DECIMATION_RESOLUTION
+        first, second = cell_ids.min(axis=1), cell_ids.max(axis=1)
+        keys = first * (width * width) + second
+        _, representatives = numpy.unique(keys[first != second], return_index=True)
+
+        near_indices = indices[near][first != second]
+        return numpy.concatenate((near_indices[representatives], indices[~near]))
+
+    @staticmethod
+    def decimate_nodes(positions: numpy.ndarray, indices: numpy.ndarray, xlim: (float, float),
+                       ylim: (float, float)) -> numpy.ndarray:
+        """
+        :param positions: the position of every node, shape (nodes, 2)
+        :param indices: indices of the visible nodes
+        :param xlim: the x limits of the view
+        :param ylim: the y limits of the view
+        :return: indices of the nodes to draw, one node per grid cell
+        """
+        cells = LevelOfDetail.__cells(positions[indices], xlim, ylim)
+        _, representatives = numpy.unique(cells[:, 0] * (DECIMATION_RESOLUTION + 1) + cells[:, 1],
+                                          return_index=True)
+        return indices[representatives]
+
+    @staticmethod
+    def edges_to_draw(segments: numpy.ndarray, xlim: (float, float), ylim: (float, float)) -> numpy.ndarray:
+        """
+        :param segments: the start and end position of every edge, shape (edges, 2, 2)
+        :param xlim: the x limits of the view
+        :param ylim: the y limits of the view
+        :return: indices of the edges to draw in the view
+        """
+        indices = LevelOfDetail.visible_edges(segments, xlim, ylim)
+        if len(indices) > MAX_DETAILED_EDGES:
+            indices = LevelOfDetail.decimate_edges(segments, indices, xlim, ylim)
+        return indices
+
+    @staticmethod
+    def nodes_to_draw(positions: numpy.ndarray, xlim: (float, float), ylim: (float, float)) -> numpy.ndarray:
+        """
+        :param positions: the position of every node, shape (nodes, 2)
+        :param xlim: the x limits of the view
+        :param ylim: the y limits of the view
+        :return: indices of the nodes to draw in the view
+        """
+        indices = LevelOfDetail.visible_nodes(positions, xlim, ylim)
+        if len(indices) > MAX_DETAILED_NODES:
+            indices = LevelOfDetail.decimate_nodes(positions, indices, xlim, ylim)
+        return indices
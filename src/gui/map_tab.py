@@ -1,28 +1,44 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
 import customtkinter
 import tkintermapview
 from tkintermapview.canvas_path import CanvasPath
 from tkintermapview.canvas_position_marker import CanvasPositionMarker
 
+from src.algorithm.heuristics import GreatCircleHeuristic
 from src.algorithm.main_algorithm import Engine
-from src.common import distance_operations
+from src.algorithm.search_stats import BUILD, SearchStats
 from src.gui import util
+from src.gui.background_task import BackgroundTask
+from src.io.binary_file_handler import BINARY_FILE_EXTENSION
+from src.io.map_importer import CSV_EXTENSIONS, GEOJSON_EXTENSIONS, ImportedMap, InvalidCoordinatesError, MapImporter
+from src.model.map_graph import MapGraph
 from src.model.node import Node
 
+# Colors of the paths on the map, the default one is the color tkintermapview draws paths with
+PATH_COLOR = '#3E69CB'
+ROUTE_COLOR = 'yellow green'
+
 
 class MapTab(customtkinter.CTkFrame):
     # Algorithm arguments
     starting_index: int = 0
     destination_index: int = 0
-    nodes: list[Node] = []  # List of available Nodes
-    adj_matrix: list[list[float]] = []  # Two-dimensional list to hold the adjacency matrix
+    map_graph: MapGraph = MapGraph()  # Markers and paths as a graph, a node's ID is its marker number
+    node_ids_by_coords: dict[tuple[float, float], int] = {}  # Node ID of every marker position
 
     # Output
     route: list[Node] = []  # List of route Nodes
     distance: float = 0
+    stats: SearchStats = SearchStats()  # Counters and phase times of the last search
+    task: BackgroundTask = None  # The search running on a worker thread
 
     # Map attributes
     markers: list[CanvasPositionMarker] = []  # Markers represent nodes
-    paths: list[CanvasPath] = []  # Paths represent edges
+    paths: dict[tuple[int, int], CanvasPath] = {}  # Paths represent edges, keyed by MapGraph.path_key
+    highlighted_paths: list[tuple[int, int]] = []  # Keys of the paths of the highlighted route
 
     def __init__(self, master, **kwargs):
         super().__init__(master, **kwargs)
@@ -44,19 +60,26 @@ class MapTab(customtkinter.CTkFrame):
                                                        command=self.add_path_event)
         self.add_path_button.grid(row=5, column=0, padx=20, pady=(10, 0))
 
+        # Import markers and paths
+        self.import_button = customtkinter.CTkButton(master=self.map_input_frame,
+                                                     text='Import',
+                                                     font=button_font,
+                                                     command=self.import_event)
+        self.import_button.grid(row=6, column=0, padx=20, pady=(10, 0))
+
         # Clear map
         self.clear_map_button = customtkinter.CTkButton(master=self.map_input_frame,
                                                         text='Clear Map',
                                                         font=button_font,
                                                         command=self.clear_map_event)
-        self.clear_map_button.grid(row=6, column=0, padx=20, pady=(10, 0))
+        self.clear_map_button.grid(row=7, column=0, padx=20, pady=(10, 0))
 
         # Start
         self.start_button = customtkinter.CTkButton(master=self.map_input_frame,
                                                     text='Start',
                                                     font=button_font,
                                                     command=self.find_shortest_route_and_visualize_route)
-        self.start_button.grid(row=14, column=0, padx=20, pady=(10, 0))
+        self.start_button.grid(row=15, column=0, padx=20, pady=(10, 0))
 
         self.map_output_frame = MapOutputFrame(master=self)
         self.map_output_frame.grid(row=0, column=1, padx=(5, 10), pady=10, sticky='nswe')
@@ -86,6 +109,12 @@ class MapTab(customtkinter.CTkFrame):
                                               pass_coords=True)
 
     def add_marker_event(self, coords) -> None:
+        # The running search reads the nodes
+        if MapTab.task is not None:
+            self.map_input_frame.map_message.configure(text='Search running.',
+                                                       text_color='red')
+            return
+
         marker_id = len(MapTab.markers)
         marker_address = tkintermapview.convert_coordinates_to_address(coords[0], coords[1])
         new_marker = self.map.set_marker(coords[0],
@@ -93,7 +122,8 @@ class MapTab(customtkinter.CTkFrame):
                                          text=f'{marker_id}. {marker_address.street}')
 
         MapTab.markers.append(new_marker)
-        MapTab.nodes.append(Node(marker_id, coords[0], coords[1]))
+        MapTab.map_graph.add_node(coords[0], coords[1])
+        MapTab.node_ids_by_coords[(coords[0], coords[1])] = marker_id
 
     def add_path_event(self) -> None:
         # If there are less than two markers on the map
@@ -132,33 +162,15 @@ class MapTab(customtkinter.CTkFrame):
                                                        text_color='red')
             return
 
-        first_node_position: tuple[float, float] = 0.0, 0.0
-        second_node_position: tuple[float, float] = 0.0, 0.0
-
-        for node in MapTab.nodes:
-            if node.node_id == int(self.map_input_frame.first_node_entry.get()):
-                first_node_position = (node.x, node.y)
-            if node.node_id == int(self.map_input_frame.second_node_entry.get()):
-                second_node_position = (node.x, node.y)
-
-        # If MapTab.paths is empty, add path without checking
-        if len(MapTab.paths) == 0:
-            new_path = self.map.set_path([first_node_position, second_node_position])
-            MapTab.paths.append(new_path)
-            self.map_input_frame.map_message.configure(text="Path added.",
-                                                       text_color='green')
-            return
-
-        # Check if the path already exists
-        should_add = True
-        for path in MapTab.paths:
-            if (path.position_list[0] == first_node_position and path.position_list[1] == second_node_position) or \
-                    (path.position_list[0] == first_node_position and path.position_list[1] == first_node_position):
-                should_add = False
+        first_node = MapTab.map_graph.nodes[int(self.map_input_frame.first_node_entry.get())]
+        second_node = MapTab.map_graph.nodes[int(self.map_input_frame.second_node_entry.get())]
 
-        if should_add:
-            new_path = self.map.set_path([first_node_position, second_node_position])
-            MapTab.paths.append(new_path)
+        # Check if the path already exists, in either direction
+        path_key = MapGraph.path_key(first_node.node_id, second_node.node_id)
+        if path_key not in MapTab.paths:
+            new_path = self.map.set_path([(first_node.x, first_node.y), (second_node.x, second_node.y)])
+            MapTab.paths[path_key] = new_path
+            MapTab.map_graph.cache_edge_weights([path_key])
             self.map_input_frame.map_message.configure(text="Path added.",
                                                        text_color='green')
             return
@@ -170,31 +182,129 @@ class MapTab(customtkinter.CTkFrame):
         # Reset all class attribute
         MapTab.starting_index = 0
         MapTab.destination_index = 0
-        MapTab.nodes = []
-        MapTab.adj_matrix = []
+        MapTab.map_graph = MapGraph()
+        MapTab.node_ids_by_coords = {}
 
         MapTab.route = []
         MapTab.distance = 0
+        MapTab.stats = SearchStats()
 
-        MapTab.markers = []
-        MapTab.paths = []
+        # Delete the markers and paths of this tab from the map
+        for marker in MapTab.markers:
+            self.map.delete(marker)
+        for path in MapTab.paths.values():
+            self.map.delete(path)
 
-        # Delete all markers and paths from the map
-        self.map.delete_all_marker()
-        self.map.delete_all_path()
+        MapTab.markers = []
+        MapTab.paths = {}
+        MapTab.highlighted_paths = []
 
         # Clear any output
         self.map_output_frame.result_tab_view.route_label.configure(text='')
         self.map_output_frame.result_tab_view.distance_label.configure(text='')
+        self.map_output_frame.result_tab_view.stats_label.configure(text='')
         self.map_input_frame.status_message.configure(text='')
 
         self.map_input_frame.map_message.configure(text='Map cleared.',
                                                    text_color='green')
 
+    def import_event(self) -> None:
+        # The running search reads the nodes
+        if MapTab.task is not None:
+            self.map_input_frame.map_message.configure(text='Search running.',
+                                                       text_color='red')
+            return
+
+        self.map_input_frame.map_message.configure(text='')
+
+        # The dialog is shown on the main thread, the file is read on a worker thread
+        file_path = customtkinter.filedialog.askopenfilename(
+            title='Import Markers and Paths',
+            filetypes=[("CSV Files", ' '.join(f'*{extension}' for extension in CSV_EXTENSIONS)),
+                       ("GeoJSON Files", ' '.join(f'*{extension}' for extension in GEOJSON_EXTENSIONS)),
+                       ("Text Files", "*.txt"),
+                       ("Compass Graph Files", f"*{BINARY_FILE_EXTENSION}")])
+        self.start_task(lambda task: MapImporter.load_file(file_path),
+                        on_done=self.add_imported_map,
+                        on_error=self.show_import_error,
+                        message_label=self.map_input_frame.map_message)
+
+    def show_import_error(self, error: Exception) -> None:
+        if isinstance(error, InvalidCoordinatesError):
+            # The message names the row of the file
+            self.map_input_frame.map_message.configure(text=str(error),
+                                                       text_color='red')
+        elif isinstance(error, FileNotFoundError):
+            self.map_input_frame.map_message.configure(text='Please open a file.',
+                                                       text_color='red')
+        elif isinstance(error, RuntimeError):
+            self.map_input_frame.map_message.configure(text='Invalid file.',
+                                                       text_color='red')
+        else:
+            raise error
+
+    def add_imported_map(self, imported_map: ImportedMap) -> None:
+        """
+        Puts imported markers and paths on the map in one batch. Markers are labelled with their imported name
+        instead of a looked up address, and the path weights and the graph are computed once for the whole import.
+        :param imported_map: the markers and paths read from a file
+        """
+        # Imported markers at the position of a marker on the map are that marker
+        node_ids = []
+        new_markers = []
+        for (latitude, longitude), name in zip(imported_map.coordinates, imported_map.names):
+            node_id = MapTab.node_ids_by_coords.get((latitude, longitude))
+            if node_id is None:
+                node_id = len(MapTab.markers)
+                new_marker = self.map.set_marker(latitude, longitude,
+                                                 text=f'{node_id}. {name}' if name else f'{node_id}.')
+                new_markers.append(new_marker)
+
+                MapTab.markers.append(new_marker)
+                MapTab.map_graph.add_node(latitude, longitude)
+                MapTab.node_ids_by_coords[(latitude, longitude)] = node_id
+            node_ids.append(node_id)
+
+        new_path_keys = []
+        new_paths = []
+        for first_index, second_index in imported_map.paths:
+            path_key = MapGraph.path_key(node_ids[first_index], node_ids[second_index])
+            if path_key[0] == path_key[1] or path_key in MapTab.paths:
+                continue
+
+            first_node, second_node = MapTab.map_graph.nodes[path_key[0]], MapTab.map_graph.nodes[path_key[1]]
+            new_path = self.map.set_path([(first_node.x, first_node.y), (second_node.x, second_node.y)])
+            new_paths.append(new_path)
+            new_path_keys.append(path_key)
+            MapTab.paths[path_key] = new_path
+
+        # All new weights in one batch, and the graph is built once instead of at every path
+        MapTab.map_graph.cache_edge_weights(new_path_keys)
+        MapTab.map_graph.build_graph()
+
+        # The map is moved onto the imported markers
+        if len(imported_map.coordinates) > 0:
+            latitudes = [latitude for latitude, _ in imported_map.coordinates]
+            longitudes = [longitude for _, longitude in imported_map.coordinates]
+            if min(latitudes) == max(latitudes) or min(longitudes) == max(longitudes):
+                self.map.set_position((min(latitudes) + max(latitudes)) / 2,
+                                      (min(longitudes) + max(longitudes)) / 2)
+            else:
+                self.map.fit_bounding_box((max(latitudes), min(longitudes)), (min(latitudes), max(longitudes)))
+
+        self.map_input_frame.map_message.configure(text=f'Imported {len(new_markers)} markers, '
+                                                        f'{len(new_paths)} paths.',
+                                                   text_color='green')
+
     def search_event(self, event=None) -> None:
         self.map.set_address(self.search_map_entry.get())
 
     def find_shortest_route_and_visualize_route(self) -> None:
+        # While a route is searched, the Start button cancels the search
+        if MapTab.task is not None:
+            MapTab.task.cancel()
+            return
+
         # If there is less than 2 markers on the map
         if len(MapTab.markers) < 2:
             self.map_input_frame.status_message.configure(text="Not enough markers.",
@@ -231,102 +341,146 @@ class MapTab(customtkinter.CTkFrame):
             else:
                 self.map_input_frame.status_message.configure(text="")
 
-        try:
-            self.find_shortest_route()
-        except TypeError:
+        # The widgets are read on the main thread, the graph is built and searched on a worker thread
+        MapTab.starting_index = int(self.map_input_frame.starting_node_entry.get())
+        MapTab.destination_index = int(self.map_input_frame.destination_node_entry.get())
+        algorithm = self.map_input_frame.algorithm_options.get()
+        self.start_task(lambda task: MapTab.find_shortest_route(algorithm, task),
+                        on_done=self.show_search_result,
+                        on_error=self.show_search_error,
+                        message_label=self.map_input_frame.status_message)
+
+    def start_task(self, function: Callable[[BackgroundTask], Any], on_done: Callable[[Any], None],
+                   on_error: Callable[[Exception], None], message_label: customtkinter.CTkLabel) -> None:
+        """
+        Runs a search or an import on a worker thread, the Start button cancels it and the map cannot be edited
+        until it has finished
+        :param function: the work, called with the task
+        :param on_done: called with the result on the main thread
+        :param on_error: called with the exception raised by the function on the main thread
+        :param message_label: where the progress is shown
+        """
+        def finish(callback: Callable, *args) -> None:
+            MapTab.task = None
+            self.start_button.configure(text='Start')
+            self.add_path_button.configure(state='normal')
+            self.import_button.configure(state='normal')
+            self.clear_map_button.configure(state='normal')
+            callback(*args)
+
+        MapTab.task = BackgroundTask(self, function,
+                                     on_done=lambda result: finish(on_done, result),
+                                     on_error=lambda error: finish(on_error, error),
+                                     on_progress=lambda message: message_label.configure(text=message,
+                                                                                         text_color='gray50'),
+                                     on_cancel=lambda: finish(lambda: message_label.configure(text='Cancelled.',
+                                                                                              text_color='red')))
+        self.start_button.configure(text='Cancel')
+        self.add_path_button.configure(state='disabled')
+        self.import_button.configure(state='disabled')
+        self.clear_map_button.configure(state='disabled')
+        MapTab.task.start()
+
+    def show_search_result(self, result: (float, list[Node], SearchStats) | None) -> None:
+        if result is None:
             # There is no route from the starting node to the destination node
             self.map_input_frame.status_message.configure(text="No route found.",
                                                           text_color='red')
             return
 
+        MapTab.distance, MapTab.route, MapTab.stats = result
         self.visualize_route()
         self.show_route_and_distance()
 
-    def find_shortest_route(self) -> None:
-        MapTab.starting_index = int(self.map_input_frame.starting_node_entry.get())
-        MapTab.destination_index = int(self.map_input_frame.destination_node_entry.get())
-
-        MapTab.fill_adj_matrix()
-
-        # Start algorithm
-        if self.map_input_frame.algorithm_options.get() == 'A*':
-            # A-star path-finding
-            MapTab.distance, MapTab.route = Engine.search_astar(MapTab.starting_index,
-                                                                MapTab.destination_index,
-                                                                MapTab.nodes,
-                                                                MapTab.adj_matrix)
-        else:
-            # UCS path-finding
-            MapTab.distance, MapTab.route = Engine.search_ucs(MapTab.starting_index,
-                                                              MapTab.destination_index,
-                                                              MapTab.nodes,
-                                                              MapTab.adj_matrix)
+    def show_search_error(self, error: Exception) -> None:
+        # A search only fails because of a bug, it is reported like any other error in a Tk callback
+        raise error
 
     @staticmethod
-    def fill_adj_matrix() -> None:
-        # First, we clear the adjacency matrix
-        MapTab.adj_matrix = []
-
-        # Then, we create a list of tuples.
-        # Each tuple represents the nodes that are adjacent
-        # The integer values in the tuples are node IDs
-        adjacent_nodes: list[tuple[Node, Node]] = []
-        while len(adjacent_nodes) < len(MapTab.paths):
-
-            for path in MapTab.paths:
-                first_node = None
-                second_node = None
+    def find_shortest_route(algorithm: str, task: BackgroundTask) -> (float, list[Node], SearchStats) | None:
+        """
+        Builds the graph from the paths and searches the route between the starting node and the destination node,
+        runs on a worker thread
+        :param algorithm: one of the algorithm options
+        :param task: the task running the search, a cancelled task stops the search
+        :return: the distance, the route and the search statistics, or None if there is no route
+        """
+        build_stats = SearchStats()
+        with build_stats.phase(BUILD):
+            MapTab.map_graph.build_graph()
 
-                for node in MapTab.nodes:
-                    if path.position_list[0] == (node.x, node.y):
-                        first_node = node
-                        break
+        # Start algorithm
+        task.check_cancelled()
+        with task.searching():
+            result = MapTab.search(algorithm)
+            if result is None:
+                return None
 
-                for node in MapTab.nodes:
-                    if path.position_list[1] == (node.x, node.y):
-                        second_node = node
-                        break
+            # Search statistics together with the time spent building the graph from the paths
+            stats = Engine.stats
+            stats.phase_times.update(build_stats.phase_times)
 
-                adjacent_nodes.append((first_node, second_node))
+        distance, route = result
+        return distance, route, stats
 
-        # Fill adj_matrix with 0.0
-        for i in range(len(MapTab.nodes)):
-            MapTab.adj_matrix.append([0.0 for _ in range(len(MapTab.nodes))])
+    @staticmethod
+    def search(algorithm: str) -> (float, list[Node]) | None:
+        """
+        :param algorithm: one of the algorithm options
+        :return: the distance and the route, or None if there is no route
+        """
+        if algorithm == 'A*':
+            # A-star path-finding, the heuristic is in meters like the haversine edge weights
+            return Engine.search_astar(MapTab.starting_index,
+                                       MapTab.destination_index,
+                                       MapTab.map_graph.nodes,
+                                       MapTab.map_graph.graph,
+                                       GreatCircleHeuristic())
+        elif algorithm == 'UCS':
+            # UCS path-finding, a starting node which is searched again is answered from its shortest path tree
+            return Engine.search_repeated_ucs(MapTab.starting_index,
+                                              MapTab.destination_index,
+                                              MapTab.map_graph.nodes,
+                                              MapTab.map_graph.graph)
+        else:
+            # Bidirectional A*
+            return Engine.search_bidirectional(MapTab.starting_index,
+                                               MapTab.destination_index,
+                                               MapTab.map_graph.nodes,
+                                               MapTab.map_graph.graph,
+                                               GreatCircleHeuristic())
 
-        # Fill adj_matrix with the geodesic distance as weights
-        for adj_node in adjacent_nodes:
-            MapTab.adj_matrix[adj_node[0].node_id][adj_node[1].node_id] = \
-                distance_operations.geodesic_distance((adj_node[0].x, adj_node[0].y), (adj_node[1].x, adj_node[1].y))
+    def visualize_route(self) -> None:
+        # Each hop of the route is looked up by the node IDs of its ends
+        route_paths = [MapGraph.path_key(first_node.node_id, second_node.node_id)
+                       for first_node, second_node in zip(MapTab.route, MapTab.route[1:])]
 
-            MapTab.adj_matrix[adj_node[1].node_id][adj_node[0].node_id] = \
-                distance_operations.geodesic_distance((adj_node[0].x, adj_node[0].y), (adj_node[1].x, adj_node[1].y))
+        # Only the paths of the previous route and of the new route are recolored
+        for path_key in set(MapTab.highlighted_paths).difference(route_paths):
+            self.color_path(MapTab.paths[path_key], PATH_COLOR)
+        for path_key in route_paths:
+            self.color_path(MapTab.paths[path_key], ROUTE_COLOR)
+        MapTab.highlighted_paths = route_paths
 
-    def visualize_route(self) -> None:
-        # Resets all the path color
-        new_map_paths = []
-        for path in MapTab.paths:
-            new_map_paths.append(self.map.set_path(position_list=path.position_list))
-        MapTab.paths = new_map_paths
-
-        # Color the route paths
-        i = 0
-        while i < len(MapTab.route) - 1:
-            for path in MapTab.paths:
-                if i + 1 < len(MapTab.route):
-                    if (path.position_list[0] == (MapTab.route[i].x, MapTab.route[i].y) and
-                        path.position_list[1] == (MapTab.route[i + 1].x, MapTab.route[i + 1].y)) or \
-                            (path.position_list[1] == (MapTab.route[i].x, MapTab.route[i].y) and
-                             path.position_list[0] == (MapTab.route[i + 1].x, MapTab.route[i + 1].y)):
-                        MapTab.paths.remove(path)
-                        MapTab.paths.append(self.map.set_path(position_list=path.position_list,
-                                                              color='yellow green'))
-                        i += 1
-                else:
-                    break
+        # Markers and map controls stay above the raised route paths
+        self.map.manage_z_order()
 
         self.map_input_frame.status_message.configure(text='Route visualized.',
                                                       text_color='green')
 
+    def color_path(self, path: CanvasPath, color: str) -> None:
+        """
+        Recolors a path in place, the path keeps its color when the map is moved
+        :param path: the path on the map
+        :param color: the new color
+        """
+        path.path_color = color
+        if path.canvas_line is not None:
+            self.map.canvas.itemconfig(path.canvas_line, fill=color)
+            # The route is drawn above the other paths
+            if color == ROUTE_COLOR:
+                self.map.canvas.tag_raise(path.canvas_line)
+
     def show_route_and_distance(self) -> None:
         # Convert the route to string, example: 2-1-6-3-7
         route = ''
@@ -336,6 +490,7 @@ class MapTab(customtkinter.CTkFrame):
 
         self.map_output_frame.result_tab_view.route_label.configure(text=route)
         self.map_output_frame.result_tab_view.distance_label.configure(text=f'{MapTab.distance:.5f} m')
+        self.map_output_frame.result_tab_view.stats_label.configure(text=str(MapTab.stats))
 
     @staticmethod
     def is_index_valid(index: int) -> bool:
@@ -366,7 +521,7 @@ class MapInputFrame(customtkinter.CTkFrame):
         select_algorithm_font = customtkinter.CTkFont(family='Segoe UI', size=-13, weight='normal')
 
         # Expandable empty space between the Start button and UI theme options
-        self.grid_rowconfigure(16, weight=1)
+        self.grid_rowconfigure(17, weight=1)
 
         # App title
         self.app_title = customtkinter.CTkLabel(master=self,
@@ -398,63 +553,65 @@ class MapInputFrame(customtkinter.CTkFrame):
 
         # Add path button is defined in MapTab
 
+        # Import button is defined in MapTab
+
         # Clear map button is defined in MapTab
 
         self.map_message = customtkinter.CTkLabel(master=self,
                                                   text='',
                                                   font=message_font)
-        self.map_message.grid(row=7, column=0, padx=20, pady=(0, 0))
+        self.map_message.grid(row=8, column=0, padx=20, pady=(0, 0))
 
         # Starting node and destination node
         self.starting_node_label = customtkinter.CTkLabel(master=self,
                                                           text='Starting node:',
                                                           font=input_label_font)
-        self.starting_node_label.grid(row=8, column=0, padx=20, pady=0)
+        self.starting_node_label.grid(row=9, column=0, padx=20, pady=0)
 
         self.starting_node_entry = customtkinter.CTkEntry(master=self,
                                                           placeholder_text="Marker number",
                                                           font=entry_font)
-        self.starting_node_entry.grid(row=9, column=0, padx=20, pady=0)
+        self.starting_node_entry.grid(row=10, column=0, padx=20, pady=0)
 
         self.destination_node_label = customtkinter.CTkLabel(master=self,
                                                              text='Destination node:',
                                                              font=input_label_font)
-        self.destination_node_label.grid(row=10, column=0, padx=20, pady=0)
+        self.destination_node_label.grid(row=11, column=0, padx=20, pady=0)
 
         self.destination_node_entry = customtkinter.CTkEntry(master=self,
                                                              placeholder_text="Marker number",
                                                              font=entry_font)
-        self.destination_node_entry.grid(row=11, column=0, padx=20, pady=(0, 5))
+        self.destination_node_entry.grid(row=12, column=0, padx=20, pady=(0, 5))
 
         # Select algorithm
         self.select_algorithm_label = customtkinter.CTkLabel(master=self,
                                                              text="Select algorithm:",
                                                              font=input_label_font)
-        self.select_algorithm_label.grid(row=12, column=0, padx=20, pady=(5, 0))
+        self.select_algorithm_label.grid(row=13, column=0, padx=20, pady=(5, 0))
 
         self.algorithm_options = customtkinter.CTkOptionMenu(master=self,
-                                                             values=['A*', 'UCS'],
+                                                             values=['A*', 'UCS', 'Bidirectional'],
                                                              font=select_algorithm_font)
-        self.algorithm_options.grid(row=13, column=0, padx=20, pady=(0, 10))
+        self.algorithm_options.grid(row=14, column=0, padx=20, pady=(0, 10))
 
         # Start button is defined in MapTab
 
         self.status_message = customtkinter.CTkLabel(master=self,
                                                      text='',
                                                      font=message_font)
-        self.status_message.grid(row=15, column=0, padx=20, pady=0)
+        self.status_message.grid(row=16, column=0, padx=20, pady=0)
 
         # Select GUI theme
         self.select_theme_label = customtkinter.CTkLabel(master=self,
                                                          text="Select theme:",
                                                          font=select_theme_font)
-        self.select_theme_label.grid(row=17, column=0, padx=20, pady=0)
+        self.select_theme_label.grid(row=18, column=0, padx=20, pady=0)
 
         self.theme_options = customtkinter.CTkOptionMenu(master=self,
                                                          values=["Dark", "Light", "System"],
                                                          font=select_theme_font,
                                                          command=util.change_appearance_mode)
-        self.theme_options.grid(row=18, column=0, padx=20, pady=(0, 20))
+        self.theme_options.grid(row=19, column=0, padx=20, pady=(0, 20))
 
 
 class MapOutputFrame(customtkinter.CTkFrame):
@@ -487,12 +644,14 @@ class MapResultTabView(customtkinter.CTkTabview):
 
         output_font = customtkinter.CTkFont(family='Segoe UI', size=-14, weight='normal')
 
-        # Create two tabs for output
+        # Create three tabs for output
         self.add('Route')
         self.add('Distance')
+        self.add('Stats')
 
         self.tab('Route').grid_columnconfigure(0, weight=1)
         self.tab('Distance').grid_columnconfigure(0, weight=1)
+        self.tab('Stats').grid_columnconfigure(0, weight=1)
 
         # Create a scrollable frame to hold the route
         self.route_scrollable_frame = customtkinter.CTkScrollableFrame(master=self.tab('Route'),
@@ -512,3 +671,11 @@ class MapResultTabView(customtkinter.CTkTabview):
                                                      text_color='green',
                                                      font=output_font)
         self.distance_label.grid(row=0, column=0, pady=(20, 0))
+
+        # Create a label for search statistics
+        self.stats_label = customtkinter.CTkLabel(master=self.tab('Stats'),
+                                                  text='',
+                                                  text_color='green',
+                                                  justify='left',
+                                                  font=output_font)
+        self.stats_label.grid(row=0, column=0, pady=(10, 0))
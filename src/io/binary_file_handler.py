@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from src.io.section_file import SectionFile
+from src.model.graph import Graph
+from src.model.node import Node
+from src.model.node_table import NodeTable
+
+try:
+    import numpy
+except ImportError:  # the sections are checked in pure Python instead
+    numpy = None
+
+# file layout (little-endian):
+#   header      magic, format version, node count, edge count
+#   x           float64[node count]
+#   y           float64[node count]
+#   offsets     int64[node count + 1]
+#   weights     float64[edge count]
+#   neighbours  int32[edge count]
+MAGIC = b'CMPG'
+VERSION = 1
+HEADER = struct.Struct('<4sIqq')
+
+BINARY_FILE_EXTENSION = '.cgraph'
+
+
+class MappedFile:
+    """
+    A memory-mapped binary graph file together with the views of its sections, which are released before the file
+    is closed. The file can only be closed once no other view or NumPy array of its sections is alive.
+    """
+
+    def __init__(self, mapped_file: mmap.mmap):
+        self.mapped_file = mapped_file
+        self.buffer = memoryview(mapped_file)
+        self.views: list[memoryview] = []
+
+    def close(self) -> None:
+        for view in self.views:
+            view.release()
+        self.views = []
+        self.buffer.release()
+        self.mapped_file.close()
+
+
+class BinaryFileHandler:
+    @staticmethod
+    def __section(mapped_file: MappedFile, position: int, typecode: str, length: int) -> (memoryview, int):
+        end = position + length * struct.calcsize(typecode)
+        section = mapped_file.buffer[position:end].cast(typecode)
+        mapped_file.views.append(section)
+
+        # the sections are stored little-endian, big-endian hosts get a byte-swapped copy
+        if sys.byteorder != 'little':
+            section = array(typecode, section)
+            section.byteswap()
+
+        return section, end
+
+    @staticmethod
+    def __is_valid_graph(offsets: memoryview | array, neighbours: memoryview | array, node_count: int,
+                         edge_count: int) -> bool:
+        # a corrupt file must fail when it is loaded, not with an IndexError or a wrong route during a search
+        if offsets[0] != 0 or offsets[node_count] != edge_count:
+            return False
+
+        if numpy is not None:
+            offset_values = numpy.frombuffer(offsets, dtype=numpy.int64)
+            neighbour_values = numpy.frombuffer(neighbours, dtype=numpy.int32)
+            valid = bool((offset_values[1:] >= offset_values[:-1]).all()) and \
+                (edge_count == 0 or (int(neighbour_values.min()) >= 0 and int(neighbour_values.max()) < node_count))
+
+            # the arrays hold the mapped file open until they are gone
+            del offset_values, neighbour_values
+            return valid
+
+        return all(offsets[u] <= offsets[u + 1] for u in range(node_count)) and \
+            (edge_count == 0 or (min(neighbours) >= 0 and max(neighbours) < node_count))
+
+    @staticmethod
+    def is_binary_file(path: str) -> bool:
+        """
+        :param path: path to a graph file
+        :return: True if the file is stored in the binary graph format, False otherwise
+        """
+        with open(path, 'rb') as file:
+            return file.read(len(MAGIC)) == MAGIC
+
+    @staticmethod
+    def load_file(path: str) -> (NodeTable, Graph):
+        """
+        Memory-maps a binary graph file, the arrays of the returned nodes and graph read directly from the mapped pages.
+        The pages are shared with every other process mapping the same file, Graph.close() unmaps them.
+        :param path: path to the binary graph file
+        :return: the node table and the graph
+        """
+        with open(path, 'rb') as file:
+            try:
+                mapped_file = MappedFile(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+            except ValueError:  # empty file
+                raise RuntimeError("Error while processing file.")
+
+        buffer = mapped_file.buffer
+        if len(buffer) < HEADER.size:
+            mapped_file.close()
+            raise RuntimeError("Error while processing file.")
+
+        magic, version, node_count, edge_count = HEADER.unpack_from(buffer)
+        expected_size = HEADER.size + 8 * (3 * node_count + 1) + 12 * edge_count
+        if magic != MAGIC or version != VERSION or node_count < 0 or edge_count < 0 or len(buffer) != expected_size:
+            mapped_file.close()
+            raise RuntimeError("Error while processing file.")
+
+        position = HEADER.size
+        x, position = BinaryFileHandler.__section(mapped_file, position, 'd', node_count)
+        y, position = BinaryFileHandler.__section(mapped_file, position, 'd', node_count)
+        offsets, position = BinaryFileHandler.__section(mapped_file, position, 'q', node_count + 1)
+        weights, position = BinaryFileHandler.__section(mapped_file, position, 'd', edge_count)
+        neighbours, position = BinaryFileHandler.__section(mapped_file, position, 'i', edge_count)
+
+        if not BinaryFileHandler.__is_valid_graph(offsets, neighbours, node_count, edge_count):
+            mapped_file.close()
+            raise RuntimeError("Error while processing file.")
+
+        graph = Graph(offsets, neighbours, weights)
+        graph.mapped_file = mapped_file
+        return NodeTable(x, y), graph
+
+    @staticmethod
+    def save_file(path: str, node_list: NodeTable | list[Node], graph: Graph) -> None:
+        """
+        :param path: path to the binary graph file
+        :param node_list: the nodes
+        :param graph: the graph
+        """
+        node_table = NodeTable.from_nodes(node_list)
+        sections = [array('d', node_table.x),
+                    array('d', node_table.y),
+                    array('q', graph.offsets),
+                    array('d', graph.weights),
+                    array('i', graph.neighbours)]
+
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(node_list), graph.edge_count))
+            SectionFile.write_sections(file, sections)
+
+    @staticmethod
+    def binary_path_of(path: str, directory: str, node_list: NodeTable | list[Node] = None,
+                       graph: Graph = None) -> str:
+        """
+        Finds or creates a binary graph file which can be memory-mapped by several processes
+        :param path: path to a graph file in either format
+        :param directory: where a converted copy of a text graph file is written
+        :param node_list: the nodes of the file if they are already loaded, a text file is then not parsed again
+        :param graph: the graph of the file if it is already loaded
+        :return: the path itself if the file is already in the binary format, otherwise the path to the converted copy
+        """
+        if BinaryFileHandler.is_binary_file(path):
+            return path
+
+        binary_path = os.path.join(directory, 'graph' + BINARY_FILE_EXTENSION)
+        if node_list is not None and graph is not None:
+            BinaryFileHandler.save_file(binary_path, node_list, graph)
+        else:
+            BinaryFileHandler.convert(path, binary_path)
+        return binary_path
+
+    @staticmethod
+    def convert(text_path: str, binary_path: str) -> None:
+        """
+        Converts a text graph file to the binary graph format
+        :param text_path: path to the text graph file
+        :param binary_path: path to the binary graph file
+        """
+        # imported here to avoid a circular import, FileInputHandler opens binary files through this class
+        from src.io.file_handler import FileInputHandler
+
+        node_list, graph = FileInputHandler.load_file(text_path)
+        BinaryFileHandler.save_file(binary_path, node_list, graph)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert a text graph file to the binary graph format.')
+    parser.add_argument('input', help='path to the text graph file')
+    parser.add_argument('output', help=f'path to the binary graph file, usually ending in {BINARY_FILE_EXTENSION}')
+    args = parser.parse_args()
+
+    BinaryFileHandler.convert(args.input, args.output)
@@ -1,43 +1,173 @@
-from src.model.node import Node
+from __future__ import annotations
+
+import warnings
+from array import array
+from typing import Iterator, TextIO
+
+from src.io.binary_file_handler import BinaryFileHandler
+from src.model.graph import EDGE_EPSILON, Graph, is_edge
+from src.model.node_table import NodeTable
+
+try:
+    import numpy
+except ImportError:  # the pure Python parser is used instead
+    numpy = None
+
+# upper bound on the number of weights parsed by NumPy at once
+NUMPY_CHUNK_SIZE = 1 << 20
 
 
 class FileInputHandler:
     @staticmethod
-    def load_file(path: str) -> (list[Node], list[list[float]]):
-        file1 = open(path, 'r')
+    def __non_blank_lines(file: TextIO) -> Iterator[str]:
+        # lines are read one at a time, blank lines are skipped
+        for line in file:
+            if not line.isspace():
+                yield line
+
+    @staticmethod
+    def __read_nodes(lines: Iterator[str], node_count: int) -> NodeTable:
+        node_list = NodeTable()
+        for _ in range(node_count):
+            coordinates = next(lines).split()
+            if len(coordinates) != 2:
+                raise RuntimeError("Error while processing file.")
+            node_list.append(float(coordinates[0]), float(coordinates[1]))
+
+        return node_list
+
+    @staticmethod
+    def __read_adj_matrix(lines: Iterator[str], node_count: int) -> Graph:
+        # every row of the adjacency matrix is appended to the graph as soon as it is read,
+        # so only the non-zero weights are ever kept in memory
+        offsets = array('q', [0])
+        neighbours = array('i')
+        weights = array('d')
+
+        for line in lines:
+            row = line.split()
+            if len(row) != node_count or len(offsets) > node_count:
+                raise RuntimeError("Error while processing file.")
+
+            for j, weight in enumerate(row):
+                weight = float(weight)
+                if is_edge(weight):
+                    neighbours.append(j)
+                    weights.append(weight)
+            offsets.append(len(neighbours))
+
+        if len(offsets) != node_count + 1:
+            raise RuntimeError("Error while processing file.")
+
+        return Graph(offsets, neighbours, weights)
+
+    @staticmethod
+    def __load_text(lines: Iterator[str], row_count: int, column_count: int) -> numpy.ndarray:
+        # NumPy raises a ValueError if the rows do not have the same number of values,
+        # "#" is not a comment so the same lines are rejected as by the pure Python parser
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)  # input contained no data
+            values = numpy.loadtxt(lines, dtype=numpy.float64, comments=None, max_rows=row_count, ndmin=2)
+
+        if values.shape != (row_count, column_count):
+            raise RuntimeError("Error while processing file.")
+
+        return values
+
+    @staticmethod
+    def __read_nodes_numpy(lines: Iterator[str], node_count: int) -> NodeTable:
+        if node_count == 0:
+            return NodeTable()
 
-        lines = file1.readlines()
-        node_count = -1
-        node_list: list[Node] = []
-        adj_matrix: list[list[float]] = []
+        coordinates = FileInputHandler.__load_text(lines, node_count, 2)
+        return NodeTable(array('d', numpy.ascontiguousarray(coordinates[:, 0]).tobytes()),
+                         array('d', numpy.ascontiguousarray(coordinates[:, 1]).tobytes()))
+
+    @staticmethod
+    def __read_adj_matrix_numpy(lines: Iterator[str], node_count: int) -> Graph:
+        # the matrix is parsed in blocks of rows so a dense matrix never has to fit in memory at once
+        offsets = array('q', [0])
+        neighbours = array('i')
+        weights = array('d')
+
+        block_size = max(1, NUMPY_CHUNK_SIZE // max(1, node_count))
+        for block_start in range(0, node_count, block_size):
+            block = FileInputHandler.__load_text(lines, min(block_size, node_count - block_start), node_count)
+
+            is_edge_block = numpy.abs(block) > EDGE_EPSILON
+            rows, columns = numpy.nonzero(is_edge_block)
+            row_offsets = numpy.cumsum(numpy.count_nonzero(is_edge_block, axis=1)) + len(neighbours)
+
+            offsets.frombytes(row_offsets.astype(numpy.int64).tobytes())
+            neighbours.frombytes(columns.astype(numpy.int32).tobytes())
+            weights.frombytes(block[rows, columns].tobytes())
+
+        # there must not be more rows than nodes
+        if next(lines, None) is not None:
+            raise RuntimeError("Error while processing file.")
+
+        return Graph(offsets, neighbours, weights)
+
+    @staticmethod
+    def __read_edge_list(lines: Iterator[str], node_count: int, edge_count: int) -> Graph:
+        def edges() -> Iterator[tuple[int, int, float]]:
+            read_count = 0
+            for line in lines:
+                edge = line.split()
+                if len(edge) != 3:
+                    raise RuntimeError("Error while processing file.")
+                read_count += 1
+                yield int(edge[0]), int(edge[1]), float(edge[2])
+
+            if read_count != edge_count:
+                raise RuntimeError("Error while processing file.")
+
+        return Graph.from_edges(node_count, edges())
+
+    @staticmethod
+    def load_file(path: str, use_numpy: bool = True) -> (NodeTable, Graph):
+        """
+        Loads a graph from a text file.
+        The first line holds the node count, followed by one line of coordinates per node.
+        If the first line only holds the node count, the coordinates are followed by the weighted adjacency matrix.
+        If the first line holds the node count and an edge count, the coordinates are followed by
+        one "source target weight" line per edge.
+        The coordinates and the adjacency matrix are parsed in bulk with NumPy when it is installed.
+        Files in the binary graph format are memory-mapped instead of parsed.
+        :param path: path to the text file
+        :param use_numpy: whether NumPy may be used to parse the file
+        :return: the node table and the graph
+        """
+        if BinaryFileHandler.is_binary_file(path):
+            return BinaryFileHandler.load_file(path)
+
+        use_numpy = use_numpy and numpy is not None
+
+        with open(path, 'r') as file:
+            lines = FileInputHandler.__non_blank_lines(file)
 
-        for i, line in enumerate(lines):
             try:
-                if i == 0:  # matrix size / node count
-                    node_count = int(line)
-                    adj_matrix = [[] for _ in range(node_count)]
-                    continue
-
-                if 0 < i < node_count + 1:
-                    node_id = i - 1
-                    coordinates = line.split(' ')
-                    if len(coordinates) != 2:
-                        raise RuntimeError("Error while processing file.")
-                    node_list.append(Node(node_id, float(coordinates[0]), float(coordinates[1])))
-
-                    continue
-
-                if i >= node_count + 1:
-                    weights = line.split(' ')
-                    if len(weights) != node_count:
-                        raise RuntimeError("Error while processing file.")
-
-                    v_idx = i - (node_count + 1)
-                    adj_matrix[v_idx] = ([0.0 for _ in range(node_count)])
-                    for j, weight in enumerate(weights):
-                        adj_matrix[v_idx][j] = float(weight)
-
-            except (ValueError, IndexError):
+                header = next(lines).split()
+                if len(header) not in (1, 2):
+                    raise RuntimeError("Error while processing file.")
+
+                node_count = int(header[0])
+                if node_count < 0:
+                    raise RuntimeError("Error while processing file.")
+
+                if use_numpy:
+                    node_list = FileInputHandler.__read_nodes_numpy(lines, node_count)
+                else:
+                    node_list = FileInputHandler.__read_nodes(lines, node_count)
+
+                if len(header) == 1 and use_numpy:
+                    graph = FileInputHandler.__read_adj_matrix_numpy(lines, node_count)
+                elif len(header) == 1:
+                    graph = FileInputHandler.__read_adj_matrix(lines, node_count)
+                else:
+                    graph = FileInputHandler.__read_edge_list(lines, node_count, int(header[1]))
+
+            except (ValueError, IndexError, StopIteration):
                 raise RuntimeError("Error while processing file.")
 
-        return node_list, adj_matrix
+        return node_list, graph
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import csv
+import json
+import math
+import os
+from typing import Sequence, TextIO
+
+from src.io.file_handler import FileInputHandler
+from src.model.graph import Graph
+from src.model.node import Node
+
+CSV_EXTENSIONS = ('.csv',)
+GEOJSON_EXTENSIONS = ('.geojson', '.json')
+
+
+class InvalidCoordinatesError(RuntimeError):
+    """
+    Raised for a marker whose latitude or longitude is not a coordinate on Earth, the message names where it is
+    """
+
+
+class ImportedMap:
+    """
+    Markers and paths read from a file, ready to be put on the map in one batch.
+    Markers are (latitude, longitude) coordinates, markers at the same coordinates are merged.
+    Paths are pairs of marker indices, every path is kept once whatever the order of its ends.
+    """
+
+    def __init__(self):
+        self.coordinates: list[tuple[float, float]] = []
+        self.names: list[str] = []  # name of every marker, empty if the file gives none
+        self.paths: list[tuple[int, int]] = []
+        self.__marker_indices: dict[tuple[float, float], int] = {}
+        self.__path_keys: set[tuple[int, int]] = set()
+
+    def add_marker(self, latitude: float, longitude: float, name: str = '') -> int:
+        """
+        :param latitude: latitude of the marker
+        :param longitude: longitude of the marker
+        :param name: name of the marker, kept if the marker is new or has no name yet
+        :return: index of the marker
+        """
+        coordinates = (latitude, longitude)
+        index = self.__marker_indices.get(coordinates)
+        if index is None:
+            index = len(self.coordinates)
+            self.__marker_indices[coordinates] = index
+            self.coordinates.append(coordinates)
+            self.names.append(name)
+        elif name and not self.names[index]:
+            self.names[index] = name
+        return index
+
+    def add_path(self, first_index: int, second_index: int) -> None:
+        """
+        :param first_index: index of the marker at one end of the path
+        :param second_index: index of the marker at the other end of the path, paths to the same marker are skipped
+        """
+        key = (min(first_index, second_index), max(first_index, second_index))
+        if first_index != second_index and key not in self.__path_keys:
+            self.__path_keys.add(key)
+            self.paths.append(key)
+
+
+class MapImporter:
+    @staticmethod
+    def coordinates(latitude: float | str, longitude: float | str, location: str) -> (float, float):
+        """
+        :param latitude: the latitude read from a file
+        :param longitude: the longitude read from a file
+        :param location: where the coordinates are in the file, e.g. "row 3"
+        :return: the latitude and the longitude
+        :raises InvalidCoordinatesError: if they are not finite or out of range, the map cannot show them
+        """
+        latitude, longitude = float(latitude), float(longitude)
+        if not (math.isfinite(latitude) and math.isfinite(longitude) and
+                -90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise InvalidCoordinatesError(f"Invalid coordinates in {location}.")
+        return latitude, longitude
+
+    @staticmethod
+    def read_csv(file: TextIO) -> ImportedMap:
+        """
+        Reads markers and paths from CSV. A row of two coordinates "latitude,longitude" is a marker, a third column
+        names it. A row of four coordinates "latitude,longitude,latitude,longitude" is a path between two markers.
+        A first row which does not start with a number is a header and is skipped.
+        :param file: the CSV file
+        :return: the markers and paths
+        :raises InvalidCoordinatesError: naming the first row whose coordinates are not on Earth
+        """
+        imported_map = ImportedMap()
+        for row_number, row in enumerate(csv.reader(file)):
+            row = [value.strip() for value in row]
+            if len(row) == 0 or all(value == '' for value in row):
+                continue
+
+            if len(row) not in (2, 3, 4):
+                raise RuntimeError("Error while processing file.")
+
+            try:
+                values = [float(value) for value in (row if len(row) == 4 else row[:2])]
+            except ValueError:
+                if row_number == 0:
+                    continue
+                raise RuntimeError("Error while processing file.")
+
+            location = f'row {row_number + 1}'
+            if len(row) == 4:
+                imported_map.add_path(imported_map.add_marker(*MapImporter.coordinates(values[0], values[1], location)),
+                                      imported_map.add_marker(*MapImporter.coordinates(values[2], values[3], location)))
+            else:
+                imported_map.add_marker(*MapImporter.coordinates(values[0], values[1], location),
+                                        row[2] if len(row) == 3 else '')
+
+        return imported_map
+
+    @staticmethod
+    def __add_geometry(imported_map: ImportedMap, geometry: dict, name: str, location: str) -> None:
+        # GeoJSON positions are [longitude, latitude], lines become one path per segment
+        geometry_type = geometry.get('type')
+        if geometry_type == 'GeometryCollection':
+            for member in geometry['geometries']:
+                MapImporter.__add_geometry(imported_map, member, name, location)
+            return
+
+        if geometry_type == 'Point':
+            points, lines = [geometry['coordinates']], []
+        elif geometry_type == 'MultiPoint':
+            points, lines = geometry['coordinates'], []
+        elif geometry_type == 'LineString':
+            points, lines = [], [geometry['coordinates']]
+        elif geometry_type == 'MultiLineString':
+            points, lines = [], geometry['coordinates']
+        else:
+            # areas are not markers or paths
+            return
+
+        for longitude, latitude, *_ in points:
+            imported_map.add_marker(*MapImporter.coordinates(latitude, longitude, location), name)
+        for line in lines:
+            indices = [imported_map.add_marker(*MapImporter.coordinates(latitude, longitude, location))
+                       for longitude, latitude, *_ in line]
+            for first_index, second_index in zip(indices, indices[1:]):
+                imported_map.add_path(first_index, second_index)
+
+    @staticmethod
+    def read_geojson(file: TextIO) -> ImportedMap:
+        """
+        Reads markers and paths from GeoJSON. Points are markers, named by their "name" property,
+        every segment of a line is a path between the markers at its ends. Areas are skipped.
+        :param file: the GeoJSON file
+        :return: the markers and paths
+        :raises InvalidCoordinatesError: naming the first feature whose coordinates are not on Earth
+        """
+        imported_map = ImportedMap()
+        try:
+            document = json.load(file)
+            if document.get('type') == 'FeatureCollection':
+                features = document['features']
+            elif document.get('type') == 'Feature':
+                features = [document]
+            else:
+                features = [{'geometry': document}]
+
+            for feature_number, feature in enumerate(features, start=1):
+                if feature.get('geometry') is None:
+                    continue
+                name = (feature.get('properties') or {}).get('name') or ''
+                MapImporter.__add_geometry(imported_map, feature['geometry'], str(name), f'feature {feature_number}')
+        except (ValueError, KeyError, TypeError, AttributeError):
+            raise RuntimeError("Error while processing file.")
+
+        return imported_map
+
+    @staticmethod
+    def from_graph(node_list: Sequence[Node], graph: Graph) -> ImportedMap:
+        """
+        :param node_list: the nodes, x is read as the latitude and y as the longitude
+        :param graph: the graph, every edge becomes a path whatever its direction and weight
+        :return: the markers and paths, marker i is node i unless nodes share their coordinates
+        :raises InvalidCoordinatesError: naming the first node whose coordinates are not on Earth
+        """
+        imported_map = ImportedMap()
+        indices = [imported_map.add_marker(*MapImporter.coordinates(node.x, node.y, f'node {index}'))
+                   for index, node in enumerate(node_list)]
+        for u, v, _ in graph.edges():
+            imported_map.add_path(indices[u], indices[v])
+        return imported_map
+
+    @staticmethod
+    def load_file(path: str) -> ImportedMap:
+        """
+        Reads markers and paths from a CSV file, a GeoJSON file, or a graph file in the text or binary graph format
+        :param path: path to the file, its extension tells the format
+        :return: the markers and paths
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension in CSV_EXTENSIONS:
+            with open(path, 'r', newline='') as file:
+                return MapImporter.read_csv(file)
+        if extension in GEOJSON_EXTENSIONS:
+            with open(path, 'r') as file:
+                return MapImporter.read_geojson(file)
+
+        node_list, graph = FileInputHandler.load_file(path)
+        return MapImporter.from_graph(node_list, graph)
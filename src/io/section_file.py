@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import hashlib
+import struct
+import sys
+from array import array
+from typing import BinaryIO
+
+from src.model.graph import Graph
+
+# node count, edge count and SHA-256 digest of the graph a preprocessed file was built for
+FINGERPRINT = struct.Struct('<qq32s')
+
+
+class SectionFile:
+    """
+    Reads and writes the little-endian array sections of the binary files, and the fingerprint which ties
+    a preprocessed file (contraction hierarchy, landmark table) to the graph it was built for.
+    """
+
+    @staticmethod
+    def write_sections(file: BinaryIO, sections: list[array]) -> None:
+        """
+        :param file: the file, opened for binary writing
+        :param sections: the arrays, written one after another, they are byte-swapped in place on big-endian hosts
+        """
+        for section in sections:
+            if sys.byteorder != 'little':
+                section.byteswap()
+            section.tofile(file)
+
+    @staticmethod
+    def read_section(file: BinaryIO, typecode: str, length: int) -> array:
+        """
+        :param file: the file, opened for binary reading
+        :param typecode: the array type code of the section
+        :param length: number of values in the section
+        :return: the section
+        """
+        section = array(typecode)
+        section.frombytes(file.read(length * section.itemsize))
+        if len(section) != length:
+            raise RuntimeError("Error while processing file.")
+        if sys.byteorder != 'little':
+            section.byteswap()
+        return section
+
+    @staticmethod
+    def graph_fingerprint(graph: Graph) -> bytes:
+        """
+        :param graph: the graph
+        :return: the fingerprint of the graph, which changes with any offset, neighbour or weight
+        """
+        digest = hashlib.sha256()
+        for typecode, values in (('q', graph.offsets), ('i', graph.neighbours), ('d', graph.weights)):
+            # the digest is taken over the little-endian bytes so files can be moved between hosts
+            if sys.byteorder != 'little':
+                values = array(typecode, values)
+                values.byteswap()
+            digest.update(memoryview(values).cast('B'))
+
+        return FINGERPRINT.pack(graph.node_count, graph.edge_count, digest.digest())
+
+    @staticmethod
+    def read_fingerprint(file: BinaryIO, graph: Graph | None) -> None:
+        """
+        :param file: the file, opened for binary reading at the fingerprint
+        :param graph: the graph the file is used with, the fingerprint is only read past if None
+        :raises RuntimeError: if the file was built for a different graph
+        """
+        fingerprint = file.read(FINGERPRINT.size)
+        if len(fingerprint) != FINGERPRINT.size:
+            raise RuntimeError("Error while processing file.")
+
+        if graph is None:
+            return
+
+        node_count, edge_count, _ = FINGERPRINT.unpack(fingerprint)
+        if (node_count, edge_count) != (graph.node_count, graph.edge_count) or \
+                fingerprint != SectionFile.graph_fingerprint(graph):
+            raise RuntimeError("The file was built for a different graph.")
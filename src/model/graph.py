@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import itertools
+import math
+from array import array
+from typing import Iterable, Iterator
+
+# weights within this distance from zero are treated as "no edge"
+EDGE_EPSILON = 0.0001
+
+# source of unique graph versions
+_versions = itertools.count()
+
+
+def is_edge(weight: float) -> bool:
+    """
+    :param weight: a weight read from an adjacency matrix
+    :return: True if the weight represents an edge, False otherwise
+    """
+    return not -EDGE_EPSILON <= weight <= EDGE_EPSILON
+
+
+class Graph:
+    """
+    Directed weighted graph in compressed sparse row (CSR) form.
+
+    The outgoing edges of node u are stored at positions offsets[u] up to (but not including) offsets[u + 1]
+    of the neighbours and weights arrays.
+    The arrays may be array.array objects or memoryviews of a memory-mapped file.
+    A graph is never modified after it is built, every graph gets its own version to key cached search results.
+    """
+
+    def __init__(self, offsets: array = None, neighbours: array = None, weights: array = None):
+        self.offsets = offsets if offsets is not None else array('q', [0])
+        self.neighbours = neighbours if neighbours is not None else array('i')
+        self.weights = weights if weights is not None else array('d')
+        self.version = next(_versions)
+        self.mapped_file = None  # the memory-mapped file the arrays read from, if any
+        self.__reversed: Graph | None = None
+
+    def __enter__(self) -> Graph:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the memory-mapped file the arrays read from, if any. Neither the graph nor the node table loaded
+        with it can be used afterwards.
+        """
+        if self.mapped_file is not None:
+            self.mapped_file.close()
+            self.mapped_file = None
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def node_count(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.neighbours)
+
+    def neighbours_of(self, index: int) -> Iterator[tuple[int, float]]:
+        """
+        :param index: the node index
+        :return: an iterator of (neighbour index, edge weight) pairs of the outgoing edges of the node
+        """
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return zip(self.neighbours[start:end], self.weights[start:end])
+
+    def weight(self, source_index: int, target_index: int) -> float:
+        """
+        :param source_index: the source node index
+        :param target_index: the target node index
+        :return: the weight of the lightest edge from the source node to the target node, infinity if there is none
+        """
+        return min((weight for v, weight in self.neighbours_of(source_index) if v == target_index), default=math.inf)
+
+    def reversed(self) -> Graph:
+        """
+        :return: the graph with every edge reversed, built once and reused
+        """
+        if self.__reversed is None:
+            self.__reversed = Graph.from_edges(self.node_count, ((v, u, weight) for u, v, weight in self.edges()))
+        return self.__reversed
+
+    def edges(self) -> Iterator[tuple[int, int, float]]:
+        """
+        :return: an iterator of (source index, target index, weight) triples of every edge in the graph
+        """
+        for u in range(self.node_count):
+            for v, weight in self.neighbours_of(u):
+                yield u, v, weight
+
+    @staticmethod
+    def from_adj_matrix(adj_matrix: list[list[float]]) -> Graph:
+        """
+        :param adj_matrix: a dense weighted adjacency matrix
+        :return: the graph holding the edges of the matrix
+        """
+        offsets = array('q', [0])
+        neighbours = array('i')
+        weights = array('d')
+
+        for row in adj_matrix:
+            for j, weight in enumerate(row):
+                if is_edge(weight):
+                    neighbours.append(j)
+                    weights.append(weight)
+            offsets.append(len(neighbours))
+
+        return Graph(offsets, neighbours, weights)
+
+    @staticmethod
+    def from_edges(node_count: int, edges: Iterable[tuple[int, int, float]]) -> Graph:
+        """
+        :param node_count: the number of nodes in the graph
+        :param edges: (source index, target index, weight) triples in any order
+        :return: the graph holding the given edges
+        """
+        sources = array('i')
+        targets = array('i')
+        edge_weights = array('d')
+        for u, v, weight in edges:
+            if not is_edge(weight):
+                continue
+            if not (0 <= u < node_count and 0 <= v < node_count):
+                raise IndexError(f"Edge ({u}, {v}) is out of range.")
+            sources.append(u)
+            targets.append(v)
+            edge_weights.append(weight)
+
+        # counting sort of the edges by their source node
+        offsets = array('q', bytes(8 * (node_count + 1)))
+        for u in sources:
+            offsets[u + 1] += 1
+        for u in range(node_count):
+            offsets[u + 1] += offsets[u]
+
+        positions = array('q', offsets[:-1])
+        neighbours = array('i', bytes(4 * len(sources)))
+        weights = array('d', bytes(8 * len(sources)))
+        for u, v, weight in zip(sources, targets, edge_weights):
+            position = positions[u]
+            neighbours[position] = v
+            weights[position] = weight
+            positions[u] = position + 1
+
+        return Graph(offsets, neighbours, weights)
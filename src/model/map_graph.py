@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from src.common import distance_operations
+from src.model.graph import Graph
+from src.model.node import Node
+
+
+class MapGraph:
+    """
+    Markers and paths on a map as a graph. Every marker is a node whose ID is its index, x is its latitude and
+    y its longitude. Paths can be traversed in both directions, they are weighted by their length in meters.
+    The weight of every path is computed once, and the graph is only rebuilt when markers or paths were added.
+    """
+
+    def __init__(self):
+        self.nodes: list[Node] = []  # a node's ID is its index
+        self.edge_weights: dict[tuple[int, int], float] = {}  # weight of every path, keyed by MapGraph.path_key
+        self.graph: Graph = Graph()  # sparse graph holding the weighted edges
+        self.outdated: bool = False  # whether markers or paths were added since the graph was built
+
+    def add_node(self, latitude: float, longitude: float) -> Node:
+        """
+        :param latitude: latitude of the marker
+        :param longitude: longitude of the marker
+        :return: the new node, numbered after the existing nodes
+        """
+        node = Node(len(self.nodes), latitude, longitude)
+        self.nodes.append(node)
+        self.outdated = True
+        return node
+
+    @staticmethod
+    def path_key(first_node_id: int, second_node_id: int) -> tuple[int, int]:
+        """
+        :param first_node_id: the node ID of one end of a path
+        :param second_node_id: the node ID of the other end of the path
+        :return: the key of the path, which does not depend on the order of its ends
+        """
+        return min(first_node_id, second_node_id), max(first_node_id, second_node_id)
+
+    def cache_edge_weights(self, node_id_pairs: list[tuple[int, int]]) -> None:
+        """
+        Computes the weight of every new path once and caches it. Paths added one by one and imported paths
+        are all weighted by their haversine distance, the new weights are computed in one batch.
+        :param node_id_pairs: the node IDs of the ends of each path
+        """
+        new_pairs = []
+        for first_node_id, second_node_id in node_id_pairs:
+            pair = MapGraph.path_key(first_node_id, second_node_id)
+            if pair not in self.edge_weights:
+                new_pairs.append(pair)
+
+        if len(new_pairs) == 0:
+            return
+
+        first_coords = [(self.nodes[pair[0]].x, self.nodes[pair[0]].y) for pair in new_pairs]
+        second_coords = [(self.nodes[pair[1]].x, self.nodes[pair[1]].y) for pair in new_pairs]
+        weights = distance_operations.haversine_distances(first_coords, second_coords)
+
+        self.edge_weights.update(zip(new_pairs, weights))
+        self.outdated = True
+
+    def build_graph(self) -> Graph:
+        """
+        :return: the graph of the markers and paths, only rebuilt when markers or paths were added since it was built
+        """
+        if not self.outdated:
+            return self.graph
+
+        # The cached weights are used, paths can be traversed in both directions
+        edges: list[tuple[int, int, float]] = []
+        for (first_node_id, second_node_id), weight in self.edge_weights.items():
+            edges.append((first_node_id, second_node_id, weight))
+            edges.append((second_node_id, first_node_id, weight))
+
+        self.graph = Graph.from_edges(len(self.nodes), edges)
+        self.outdated = False
+        return self.graph
@@ -2,6 +2,9 @@ from __future__ import annotations
 
 
 class Node:
+    # no per-instance __dict__, a node only ever holds these attributes
+    __slots__ = ('node_id', 'x', 'y')
+
     def __init__(self, node_id: int, x: float, y: float):
         # a node must be retrievable from node list by its node id
         self.node_id = node_id
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from array import array
+from typing import Iterable, Iterator
+
+from src.model.node import Node
+
+
+class NodeTable:
+    """
+    Compact node list storing the coordinates of all nodes in two arrays instead of one object per node.
+    The id of a node is its index, Node objects are only created when a node is looked up.
+    The arrays may be array.array objects or memoryviews of a memory-mapped file.
+    """
+
+    def __init__(self, x: array = None, y: array = None):
+        self.x = x if x is not None else array('d')
+        self.y = y if y is not None else array('d')
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def __getitem__(self, index: int) -> Node:
+        if index < 0:
+            index += len(self.x)
+        if not 0 <= index < len(self.x):
+            raise IndexError("Node index out of range.")
+        return Node(index, self.x[index], self.y[index])
+
+    def __iter__(self) -> Iterator[Node]:
+        for node_id, (x, y) in enumerate(zip(self.x, self.y)):
+            yield Node(node_id, x, y)
+
+    def append(self, x: float, y: float) -> None:
+        """
+        :param x: x coordinate of the new node, whose id is the current number of nodes
+        :param y: y coordinate of the new node
+        """
+        self.x.append(x)
+        self.y.append(y)
+
+    @staticmethod
+    def from_nodes(nodes: Iterable[Node]) -> NodeTable:
+        """
+        :param nodes: nodes whose ids are their positions
+        :return: the node table holding the coordinates of the nodes, the nodes themselves if they already are one
+        """
+        if isinstance(nodes, NodeTable):
+            return nodes
+
+        table = NodeTable()
+        for node in nodes:
+            table.append(node.x, node.y)
+        return table
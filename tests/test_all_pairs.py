@@ -0,0 +1,65 @@
+import os
+import random
+import tempfile
+import unittest
+
+from src.algorithm.all_pairs import AllPairs
+from src.io.binary_file_handler import BinaryFileHandler
+from src.model.graph import Graph
+from src.model.node import Node
+
+try:
+    import numpy
+except ImportError:  # all-pairs distances are not available
+    numpy = None
+
+
+def random_graph(node_count: int, edge_count: int, seed: int = 0) -> Graph:
+    generator = random.Random(seed)
+    edges = [(generator.randrange(node_count), generator.randrange(node_count), generator.uniform(1, 10))
+             for _ in range(edge_count)]
+    return Graph.from_edges(node_count, edges)
+
+
+@unittest.skipIf(numpy is None, "NumPy is required to compute all-pairs distances.")
+class AllPairsTest(unittest.TestCase):
+
+    def compute(self, graph: Graph, directory: str) -> (numpy.ndarray, numpy.ndarray):
+        graph_path = os.path.join(directory, 'graph.cgraph')
+        BinaryFileHandler.save_file(graph_path, [Node(i, 0, 0) for i in range(len(graph))], graph)
+        return AllPairs.compute(graph_path, os.path.join(directory, 'output'), workers=1)
+
+    def test_dense_graph_uses_floyd_warshall(self):
+        graph = random_graph(50, 500)
+        self.assertTrue(AllPairs.uses_floyd_warshall(graph))
+
+        with tempfile.TemporaryDirectory() as directory:
+            distances, _ = self.compute(graph, directory)
+            expected, _ = AllPairs.floyd_warshall(graph, os.path.join(directory, 'expected'))
+            numpy.testing.assert_array_equal(distances, expected)
+            del distances, expected
+
+    def test_sparse_graph_uses_repeated_dijkstra(self):
+        graph = random_graph(300, 600)
+        self.assertFalse(AllPairs.uses_floyd_warshall(graph))
+
+        with tempfile.TemporaryDirectory() as directory:
+            distances, predecessors = self.compute(graph, directory)
+            expected, _ = AllPairs.floyd_warshall(graph, os.path.join(directory, 'expected'))
+            numpy.testing.assert_allclose(distances, expected)
+
+            # every route ends with an edge from its predecessor
+            sources, targets = numpy.nonzero(predecessors >= 0)
+            previous = predecessors[sources, targets]
+            edge_weights = numpy.array([graph.weight(u, v) for u, v in zip(previous.tolist(), targets.tolist())])
+            numpy.testing.assert_allclose(distances[sources, previous] + edge_weights, distances[sources, targets])
+            del distances, predecessors, expected
+
+    def test_big_graph_uses_repeated_dijkstra(self):
+        node_count = 2001
+        graph = Graph.from_edges(node_count, [(i, j, 1.0) for i in range(node_count) for j in range(0, node_count, 40)])
+        self.assertFalse(AllPairs.uses_floyd_warshall(graph))
+
+
+if __name__ == '__main__':
+    unittest.main()